@@ -0,0 +1,39 @@
+"""
+Benchmark `gct.parse.extract` on synthetic modules of increasing size.
+Extraction should scale linearly with the number of lines.
+
+Usage:
+>>> python benchmarks/bench_extract.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gct.utils as utils
+from gct.parse import extract
+from generate import DEFAULT_CONFIG, generate_module
+
+SIZES = [100, 200, 400, 800]  # number of classes
+
+
+def main():
+    print(f"{'classes':>8} {'lines':>8} {'extract (s)':>12} {'us/line':>8}")
+    for num_classes in SIZES:
+        code = generate_module(
+            DEFAULT_CONFIG._replace(num_classes=num_classes, num_functions=num_classes)
+        )
+        tree, raw_code = utils.parse_file(code)
+
+        start_time = time.perf_counter()
+        extract(tree, raw_code)
+        elapsed = time.perf_counter() - start_time
+
+        print(
+            f"{num_classes:>8} {len(raw_code):>8} {elapsed:>12.3f} {elapsed / len(raw_code) * 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Check that `import gct` (and `gct.api`) stays fast: no subprocesses and no heavy
+dependencies (graphviz, networkx, requests) are imported eagerly.
+Exits with a non-zero status if an import exceeds its upper bound.
+
+Usage:
+>>> python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+REPEAT = 5
+# module -> upper bound on import time in seconds (best of REPEAT runs)
+UPPER_BOUNDS = {"gct": 0.05, "gct.api": 0.25}
+LAZY_DEPENDENCIES = ["graphviz", "networkx", "requests"]
+
+SCRIPT = """
+import sys, time
+start_time = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start_time
+eager = [name for name in {lazy_dependencies} if name in sys.modules]
+print(elapsed, ",".join(eager))
+"""
+
+
+def time_import(module: str) -> "tuple[float, list[str]]":
+    """Import `module` in a fresh interpreter. Returns import time and eagerly imported dependencies."""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            SCRIPT.format(module=module, lazy_dependencies=LAZY_DEPENDENCIES),
+        ],
+        cwd=ROOT_FOLDER,
+        text=True,
+    )
+    elapsed, eager = output.split()[0], output.split()[1:]
+    return float(elapsed), eager
+
+
+def main():
+    failed = False
+    for module, upper_bound in UPPER_BOUNDS.items():
+        results = [time_import(module) for _ in range(REPEAT)]
+        best = min(elapsed for elapsed, _ in results)
+        eager = results[0][1]
+        status = "OK" if best <= upper_bound and not eager else "FAIL"
+        failed |= status == "FAIL"
+        print(
+            f"{status} import {module}: {best * 1000:.1f} ms (bound {upper_bound * 1000:.0f} ms)"
+            + (f", eagerly imported: {eager[0]}" if eager else "")
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
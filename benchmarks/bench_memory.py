@@ -0,0 +1,68 @@
+"""
+Measure the memory used per `Node`, and the peak memory of extracting a large
+synthetic file. `LegacyNode` reproduces the previous representation (per-instance
+`__dict__` and a `uuid1` hex id) for comparison.
+
+Usage:
+>>> python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gct.utils as utils
+from gct.network import Node
+from gct.parse import extract
+from generate import DEFAULT_CONFIG, generate_module
+
+NUM_NODES = 100_000
+NUM_CLASSES = 800  # size of the synthetic file
+
+
+class LegacyNode:
+    def __init__(self, line_start: int, line_end: int, name: str, type: str = None):
+        self.line_start = line_start
+        self.line_end = line_end
+        self.name = name
+        self.type = type
+        self.id = uuid.uuid1().hex
+
+
+def measure_nodes(node_class) -> "tuple[float, float]":
+    """Bytes and microseconds per node."""
+    names = [f"method_{i % 10}" for i in range(NUM_NODES)]  # shared, like AST names
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    nodes = [node_class(i, i + 3, names[i], "function") for i in range(NUM_NODES)]
+    elapsed = time.perf_counter() - start_time
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    return size / NUM_NODES, elapsed / NUM_NODES * 1e6
+
+
+def main():
+    for label, node_class in (("before (LegacyNode)", LegacyNode), ("after (Node)", Node)):
+        bytes_per_node, us_per_node = measure_nodes(node_class)
+        print(f"{label:>20}: {bytes_per_node:6.1f} bytes/node {us_per_node:6.2f} us/node")
+
+    code = generate_module(
+        DEFAULT_CONFIG._replace(num_classes=NUM_CLASSES, num_functions=NUM_CLASSES)
+    )
+    tree, raw_code = utils.parse_file(code)
+    tracemalloc.start()
+    node_representation, _ = extract(tree, raw_code)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_nodes = len(node_representation.get_all_nodes())
+    print(
+        f"extract {len(raw_code)} lines, {num_nodes} nodes: peak {peak / 2**20:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
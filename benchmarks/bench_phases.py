@@ -0,0 +1,159 @@
+"""
+Benchmark every phase of GCT separately on a corpus of synthetic modules (see
+`generate.py`) of increasing size and on the files in `examples/`:
+1. parse: `utils.parse_file`
+2. node creation: `parse.traverse`
+3. node connection: `parse.connect_nodes`
+4. edge resolution: `parse.resolve_calls`
+5. graphviz build: `api.to_graphviz`
+6. render: `api.render` (skipped if graphviz `dot` isn't installed or the graph is too large)
+Results are printed as a table and written as JSON, so runs can be compared across commits.
+
+Usage:
+>>> python benchmarks/bench_phases.py --output bench_results.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct
+import gct.api as api
+import gct.utils as utils
+from gct.package_config import get_dot_version
+from gct.parse import traverse, connect_nodes, resolve_calls
+from generate import DEFAULT_CONFIG, generate_module
+
+PHASES = ["parse", "nodes", "connect", "resolve", "graphviz", "render"]
+SIZES = [10, 50, 100, 200]  # number of classes (and module-level functions)
+# name -> changes to the generator config, applied at every size
+VARIANTS = {
+    "flat": dict(nesting_depth=0, num_reassigned=0),
+    "nested": dict(nesting_depth=2),
+    "dense": dict(call_density=10, self_call_ratio=0.8),
+}
+MAX_RENDER_NODES = 2000  # larger graphs take minutes to lay out with dot
+
+
+def get_corpus(sizes: "list[int]") -> "list[tuple[str, str]]":
+    """(name, source code) of every synthetic module and example file."""
+    corpus = []
+    for variant, changes in VARIANTS.items():
+        for size in sizes:
+            config = DEFAULT_CONFIG._replace(
+                num_classes=size, num_functions=size, **changes
+            )
+            corpus.append((f"{variant}-{size}", generate_module(config)))
+
+    for path in sorted(glob.glob(os.path.join(ROOT_FOLDER, "examples", "*.py"))):
+        with open(path, "r") as f:
+            corpus.append((f"examples/{os.path.basename(path)}", f.read()))
+    return corpus
+
+
+def measure(code: str, can_render: bool, max_render_nodes: int) -> dict:
+    """Time each phase on `code`. Phases that are skipped are recorded as None."""
+    timings = dict.fromkeys(PHASES)
+
+    start_time = time.perf_counter()
+    tree, raw_code = utils.parse_file(code)
+    timings["parse"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    visitor = traverse(tree, raw_code)
+    timings["nodes"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    node_representation = connect_nodes(visitor)
+    timings["connect"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    edge_representation = resolve_calls(tree, raw_code, visitor, node_representation)
+    timings["resolve"] = time.perf_counter() - start_time
+
+    num_nodes = len(node_representation.get_all_nodes())
+    result = dict(
+        lines=len(raw_code),
+        nodes=num_nodes,
+        call_sites=len(visitor.call_sites),
+        edges=len(edge_representation.get_edges()),
+        timings=timings,
+    )
+    if node_representation.get_root_node() is None:  # nothing to draw
+        return result
+
+    start_time = time.perf_counter()
+    graph = api.to_graphviz(node_representation, edge_representation)
+    timings["graphviz"] = time.perf_counter() - start_time
+
+    if can_render and num_nodes <= max_render_nodes:
+        start_time = time.perf_counter()
+        api.render(graph)
+        timings["render"] = time.perf_counter() - start_time
+    return result
+
+
+def _format_time(seconds: float) -> str:
+    return "-" if seconds is None else f"{seconds:.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output", type=str, default=None, help="path of the JSON results file"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="number of classes"
+    )
+    parser.add_argument(
+        "--max_render_nodes",
+        type=int,
+        default=MAX_RENDER_NODES,
+        help="skip rendering graphs with more nodes",
+    )
+    parser.add_argument("--no_render", action="store_true", help="skip rendering")
+    args = parser.parse_args()
+
+    dot_version = get_dot_version()
+    can_render = dot_version is not None and not args.no_render
+
+    print(
+        f"{'module':>28} {'lines':>7} {'nodes':>6} {'edges':>7} "
+        + " ".join(f"{phase:>8}" for phase in PHASES)
+    )
+    results = []
+    for name, code in get_corpus(args.sizes):
+        result = dict(module=name, **measure(code, can_render, args.max_render_nodes))
+        results.append(result)
+        print(
+            f"{name:>28} {result['lines']:>7} {result['nodes']:>6} {result['edges']:>7} "
+            + " ".join(
+                f"{_format_time(result['timings'][phase]):>8}" for phase in PHASES
+            )
+        )
+
+    if args.output:
+        report = dict(
+            meta=dict(
+                python=platform.python_version(),
+                platform=platform.platform(),
+                gct=gct.__version__,
+                dot=dot_version,
+                generator=DEFAULT_CONFIG._asdict(),
+                variants=VARIANTS,
+            ),
+            results=results,
+        )
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Check that call edges of real code match the edges of a baseline revision of GCT (by
+default the first commit of the repository), run on a few files of the standard library:
+1. files whose edges must be identical to the baseline.
+2. files where the baseline attributes calls made after a nested def, at a deeper
+indentation, to that def (its indentation scan stops at the def). Only a few of their
+edges may differ.
+The baseline is exported with `git archive`; the check is skipped outside of a git
+checkout. Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_baseline_edges.py [--baseline <revision>]
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import sysconfig
+import tarfile
+import tempfile
+
+from checks import Checker
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+IDENTICAL_FILES = [
+    "cProfile.py",
+    "configparser.py",
+    "csv.py",
+    "dataclasses.py",
+    "fractions.py",
+    "functools.py",
+    "heapq.py",
+    os.path.join("json", "decoder.py"),
+    "textwrap.py",
+]
+CHANGED_FILES = ["argparse.py", "ast.py"]
+MAX_CHANGED_EDGES = 10  # per file of `CHANGED_FILES`
+
+# Prints the call edges of every file as (caller, line, callee, line). `gct` is
+# imported as a bare package, so its `__init__` doesn't probe for graphviz.
+EDGES_SCRIPT = """
+import json, os, sys, types
+package = types.ModuleType("gct")
+package.__path__ = [os.path.join(sys.argv[1], "gct")]
+sys.modules["gct"] = package
+import gct.utils as utils
+from gct.parse import extract
+edges = {}
+for path in sys.argv[2:]:
+    tree, raw_code = utils.parse_file(path)
+    _, edge_graph = extract(tree, raw_code)
+    if hasattr(edge_graph, "get_edges"):
+        pairs = edge_graph.get_edges()
+    else:  # networkx backed graph of older revisions
+        pairs = edge_graph.G.edges()
+    edges[path] = sorted(
+        {(u.name, u.line_start, v.name, v.line_start) for u, v in pairs}
+    )
+print(json.dumps(edges))
+"""
+
+
+def get_edges(root_folder: str, paths: "list[str]") -> "dict[str, set[tuple]]":
+    """Call edges of every file, extracted by the `gct` package in `root_folder`."""
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", EDGES_SCRIPT, root_folder, *paths],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return {
+        path: {tuple(edge) for edge in edges}
+        for path, edges in json.loads(output).items()
+    }
+
+
+def export_revision(revision: str, folder: str):
+    """Write the `gct` package of `revision` to `folder`."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision, "gct"],
+        cwd=ROOT_FOLDER,
+        capture_output=True,
+        check=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(folder)
+
+
+def get_first_commit() -> str:
+    return subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"],
+        cwd=ROOT_FOLDER,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()[0]
+
+
+def print_difference(baseline: "set[tuple]", edges: "set[tuple]"):
+    for edge in sorted(baseline - edges):
+        print(f"  - {edge}")
+    for edge in sorted(edges - baseline):
+        print(f"  + {edge}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", help="git revision. Defaults to the first commit")
+    args = parser.parse_args()
+
+    try:
+        revision = args.baseline or get_first_commit()
+    except (OSError, subprocess.CalledProcessError):
+        print("Skipping baseline edge checks: not a git checkout")
+        sys.exit(0)
+
+    standard_library = sysconfig.get_paths()["stdlib"]
+    paths = [
+        os.path.join(standard_library, name)
+        for name in IDENTICAL_FILES + CHANGED_FILES
+    ]
+    checker = Checker()
+    with tempfile.TemporaryDirectory() as folder:
+        export_revision(revision, folder)
+        baseline_edges = get_edges(folder, paths)
+    edges = get_edges(ROOT_FOLDER, paths)
+
+    for name, path in zip(IDENTICAL_FILES + CHANGED_FILES, paths):
+        difference = baseline_edges[path] ^ edges[path]
+        max_difference = MAX_CHANGED_EDGES if name in CHANGED_FILES else 0
+        summary = f"{len(baseline_edges[path])} -> {len(edges[path])} edges"
+        if not checker.check(f"{name} ({summary})", len(difference) <= max_difference):
+            print_difference(baseline_edges[path], edges[path])
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Check the multi-input CLI (`python -m gct -i a.py -i 'pkg/*.py' -j 4`):
+1. every input gets its own output in the destination folder, with no name collisions.
+2. globs and inputs read from stdin (`-i -`) are expanded.
+3. a failing input is reported in the summary and the exit status, without stopping
+the others.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_batch.py
+"""
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from checks import Checker
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def run_gct(arguments: "list[str]", stdin: str = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "gct", *arguments],
+        cwd=ROOT_FOLDER,
+        input=stdin,
+        capture_output=True,
+        text=True,
+    )
+
+
+def main():
+    checker = Checker()
+    with tempfile.TemporaryDirectory() as folder:
+        # two modules with the same name in different packages
+        for package in ("first", "second"):
+            os.makedirs(os.path.join(folder, package))
+            shutil.copy(
+                os.path.join(ROOT_FOLDER, "gct", "api.py"),
+                os.path.join(folder, package, "api.py"),
+            )
+        invalid_file = os.path.join(folder, "invalid.py")
+        with open(invalid_file, "w") as f:
+            f.write("def (:\n")
+
+        destination_folder = os.path.join(folder, "graphs")
+        process = run_gct(
+            ["-i", os.path.join(folder, "*", "api.py"), "-i", invalid_file]
+            + ["-i", "-", "-f", "json", "-d", destination_folder, "-j", "4"],
+            stdin="gct/lod.py\ngct/focus.py\n",
+        )
+        outputs = sorted(os.listdir(destination_folder))
+        print(process.stdout)
+        checker.check(
+            "outputs",
+            outputs == ["first.api.json", "focus.json", "lod.json", "second.api.json"],
+        )
+        checker.check("failure reported", "FAIL" in process.stdout)
+        checker.check("exit status", process.returncode == 1)
+
+        process = run_gct(
+            ["-i", "gct/*.py", "-f", "dot", "-d", destination_folder, "-j", "4"]
+        )
+        expected = len(glob.glob(os.path.join(ROOT_FOLDER, "gct", "*.py")))
+        outputs = glob.glob(os.path.join(destination_folder, "*.dot"))
+        checker.check("glob", process.returncode == 0 and len(outputs) == expected)
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
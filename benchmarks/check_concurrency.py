@@ -0,0 +1,65 @@
+"""
+Run many analyses in parallel threads and check that every result matches the
+result of a sequential run, i.e. that `api.run`/`api.render` are reentrant.
+Rendering is only checked if graphviz `dot` is installed.
+Exits with a non-zero status if any result differs.
+
+Usage:
+>>> python benchmarks/check_concurrency.py
+"""
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct.api as api
+from gct.package_config import get_dot_version
+
+NUM_THREADS = 16
+NUM_RUNS_PER_FILE = 8
+
+
+def get_signature(graph) -> "tuple[list[str], int]":
+    """Node labels and number of edges of a graph. Node ids differ between runs."""
+    labels = sorted(re.findall(r'label="?([^"\]]+)', graph.source))
+    return labels, graph.source.count("->")
+
+
+def analyze(path: str):
+    graph, _ = api.run(path)
+    svg = api.render(graph) if get_dot_version() else None
+    return get_signature(graph), svg
+
+
+def main():
+    files = sorted(glob.glob(os.path.join(ROOT_FOLDER, "examples", "*.py")))
+    files += sorted(glob.glob(os.path.join(ROOT_FOLDER, "gct", "*.py")))
+
+    expected = {}
+    for path in files:
+        try:
+            expected[path] = get_signature(api.run(path)[0])
+        except Exception:  # no functions/classes to trace
+            continue
+    files = list(expected)
+
+    jobs = files * NUM_RUNS_PER_FILE
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        results = list(executor.map(analyze, jobs))
+
+    failures = 0
+    for path, (signature, svg) in zip(jobs, results):
+        if signature != expected[path] or (svg is not None and "<svg" not in svg):
+            failures += 1
+            print(f"FAIL {os.path.relpath(path, ROOT_FOLDER)}")
+
+    print(f"{len(jobs) - failures}/{len(jobs)} concurrent analyses matched")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
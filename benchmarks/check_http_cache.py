@@ -0,0 +1,109 @@
+"""
+Check remote input against a local HTTP server standing in for GitHub:
+1. validating a URL and reading it downloads the file once.
+2. re-running with a cache folder revalidates the cached response (304, no body).
+3. a changed file is downloaded again.
+4. consecutive requests reuse the same pooled connection.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_http_cache.py
+"""
+import email.utils
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct.api as api
+import gct.utils as utils
+from gct.url import fetch_valid_url
+from checks import Checker
+
+FILES = {"/example.py": "def a():\n    b()\n\ndef b():\n    pass\n"}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves `FILES` with ETag/Last-Modified validators and conditional requests."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests = []  # (path, status) of every request, recorded before responding
+    connections = set()  # client ports, one per connection
+    last_modified = email.utils.formatdate(time.time(), usegmt=True)
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address[1])
+        body = FILES.get(self.path)
+        if body is None:
+            Handler.requests.append((self.path, 404))
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = f'"{hash(body) & 0xFFFFFFFF:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            Handler.requests.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        Handler.requests.append((self.path, 200))
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", Handler.last_modified)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/example.py"
+
+    checker = Checker()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        status = fetch_valid_url(url, cache_dir)
+        graph, code = api.run(
+            status["url"], cache_dir=cache_dir, source=status["body"]
+        )
+        checker.check("valid url", status["valid"])
+        checker.check("single download", Handler.requests == [("/example.py", 200)])
+        checker.check("code", code == FILES["/example.py"])
+
+        Handler.requests.clear()
+        code = utils.read_source(url, cache_dir)
+        checker.check("revalidated", Handler.requests == [("/example.py", 304)])
+        checker.check("cached code", code == FILES["/example.py"])
+
+        Handler.requests.clear()
+        FILES["/example.py"] += "\ndef c():\n    a()\n"
+        code = utils.read_source(url, cache_dir)
+        checker.check("changed file", Handler.requests == [("/example.py", 200)])
+        checker.check("changed code", code == FILES["/example.py"])
+
+        Handler.requests.clear()
+        status = fetch_valid_url(url.replace("example", "missing"), cache_dir)
+        checker.check(
+            "invalid url", not status["valid"] and status["error"] is not None
+        )
+
+    checker.check("pooled connection", len(Handler.connections) == 1)
+    server.shutdown()
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
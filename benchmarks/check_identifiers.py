@@ -0,0 +1,73 @@
+"""
+Check the per-scope identifier sets used to decide which scope a call belongs to:
+1. names inside strings and comments aren't referenced.
+2. only whole identifiers match, e.g. `self.run` isn't referenced by `self.run_all()`.
+3. identifiers of nested scopes belong to their enclosing scopes too.
+Both the identifiers collected during extraction and the tokenized source are checked.
+Extraction only uses the former; the tokenized source is the fallback of
+`utils.get_immediate_parent` and `ScopeIndex` when no identifiers are given.
+Call edges of real files are checked by `check_baseline_edges.py`.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_identifiers.py
+"""
+import os
+import sys
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct.constants as constants
+import gct.utils as utils
+from gct.network import Node
+from gct.scope import ScopeIndex
+from gct.source import SourceBuffer
+from gct.syntax_tree import ScopeTrackingVisitor
+from checks import Checker
+
+CODE = '''class A:
+    def b(self):
+        text = "self.c()"  # self.d()
+        self.run_all()
+
+        def inner():
+            return self.e.f
+'''
+
+
+def get_scope_indexes(code: str) -> "tuple[ScopeIndex, ScopeIndex]":
+    """Scope indexes with identifiers from the extraction visitor, and from `tokenize`."""
+    tree, raw_code = utils.parse_source(SourceBuffer(code))
+    root = Node(constants.ROOT_NODE_LINENO, len(raw_code), "root")
+    visitor = ScopeTrackingVisitor(root)
+    visitor.visit(tree)
+    nodes = visitor.node_line_map.values()
+    return (
+        ScopeIndex.from_nodes(nodes, raw_code, visitor.identifiers),
+        ScopeIndex.from_nodes(nodes, raw_code),
+    )
+
+
+def main():
+    checker = Checker()
+    for scope_index, source in zip(get_scope_indexes(CODE), ("visitor", "tokenize")):
+        identifiers = scope_index.get_scope_identifiers(1)  # def b
+        checker.check(
+            f"strings and comments ({source})",
+            "self.c" not in identifiers and "self.d" not in identifiers,
+        )
+        checker.check(
+            f"whole identifiers ({source})",
+            "self.run_all" in identifiers and "self.run" not in identifiers,
+        )
+        checker.check(
+            f"nested scopes ({source})",
+            {"self.e", "self.e.f"} <= identifiers,
+        )
+
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Check batch remote input against a local HTTP server with artificial latency:
+1. files are downloaded concurrently, but never more than `max_per_host` at a time.
+2. extraction starts before every download is done (streaming).
+3. requests queued behind a busy host don't hold back the requests to other hosts.
+4. every extraction matches the extraction of the same code read from disk, with or
+without a process pool.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_remote.py
+"""
+import asyncio
+import glob
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct.remote as remote
+from gct.directory import extract_file
+from checks import Checker
+
+LATENCY = 0.2  # seconds per request
+MAX_PER_HOST = 4
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves the files of the repository, slowly. Tracks the requests in flight."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    starts: "list[tuple[int, float]]" = []  # (port, time) of every request
+
+    def do_GET(self):
+        with Handler.lock:
+            Handler.starts.append((self.server.server_address[1], time.perf_counter()))
+            Handler.in_flight += 1
+            Handler.max_in_flight = max(Handler.max_in_flight, Handler.in_flight)
+        time.sleep(LATENCY)
+        with open(os.path.join(ROOT_FOLDER, self.path.lstrip("/")), "rb") as f:
+            data = f.read()
+        with Handler.lock:
+            Handler.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+async def get_arrival_times(urls: "list[str]", **kwargs) -> "list[float]":
+    start_time = time.perf_counter()
+    times = []
+    async for _ in remote.iter_extractions(urls, **kwargs):
+        times.append(time.perf_counter() - start_time)
+    return times
+
+
+def get_first_start(paths: "list[str]", busy_host: str, quiet_host: str) -> float:
+    """
+    Seconds before the first request to `quiet_host` starts, when every URL of
+    `busy_host` is queued before it and there are more of them than global slots.
+    """
+    port = int(quiet_host.rsplit(":", 1)[1])
+    urls = [f"{busy_host}/{path}" for path in paths]
+    urls += [f"{quiet_host}/{path}" for path in paths[:2]]
+    Handler.starts.clear()
+    start_time = time.perf_counter()
+    asyncio.run(get_arrival_times(urls, max_concurrency=4, max_per_host=2))
+    return min(t for host, t in Handler.starts if host == port) - start_time
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    paths = sorted(glob.glob(os.path.join(ROOT_FOLDER, "gct", "*.py")))
+    urls = [f"{host}/{os.path.relpath(path, ROOT_FOLDER)}" for path in paths]
+
+    checker = Checker()
+    times = asyncio.run(get_arrival_times(urls, max_per_host=MAX_PER_HOST))
+    serial_time = LATENCY * len(urls)
+    print(f"{len(urls)} files in {times[-1]:.2f}s (serial: {serial_time:.2f}s)")
+    checker.check("concurrent", times[-1] < serial_time / 2)
+    checker.check("per host limit", Handler.max_in_flight <= MAX_PER_HOST)
+    checker.check("streaming", times[0] < times[-1] / 2)
+
+    other_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=other_server.serve_forever, daemon=True).start()
+    other_host = f"http://127.0.0.1:{other_server.server_address[1]}"
+    relative_paths = [os.path.relpath(path, ROOT_FOLDER) for path in paths]
+    first_start = get_first_start(relative_paths, host, other_host)
+    print(f"first request to the other host after {first_start:.2f}s")
+    checker.check("no head-of-line blocking", first_start < LATENCY)
+    other_server.shutdown()
+
+    extractions = remote.extract_urls(urls, max_per_host=MAX_PER_HOST)
+    checker.check("order", [extraction.path for extraction in extractions] == urls)
+    checker.check(
+        "extractions",
+        all(
+            extraction[1:] == extract_file(path)[1:]
+            for extraction, path in zip(extractions, paths)
+        ),
+    )
+
+    serial_extractions = remote.extract_urls(
+        urls, max_per_host=MAX_PER_HOST, max_workers=1
+    )
+    checker.check("in-process extractions", serial_extractions == extractions)
+
+    node_representation, _ = remote.merge_urls(extractions)
+    modules = node_representation.get_children_nodes(
+        node_representation.get_root_node()
+    )
+    checker.check("module names", "api" in {node.name for node in modules})
+
+    server.shutdown()
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Check that output is deterministic and that unchanged graphs are rendered from cache:
+1. DOT sources of a file and of a package are identical across processes and hash seeds.
+2. a second render of the same graph is a render cache hit and returns the same output.
+3. a changed graph is rendered again.
+The render checks are skipped if graphviz `dot` isn't installed.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_render_cache.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+import gct.api as api
+from gct.package_config import get_dot_version
+from gct.stats import Stats
+from checks import Checker
+
+SOURCE_HASH_SCRIPT = """
+import hashlib
+import gct.api as api
+graph, _ = api.run("gct/api.py")
+package_graph = api.run_package("gct", max_workers=2)
+print(hashlib.sha256((graph.source + package_graph.source).encode()).hexdigest())
+"""
+
+
+def get_source_hash(seed: int) -> str:
+    """Hash of the DOT sources, computed in a new process with the given hash seed."""
+    return subprocess.run(
+        [sys.executable, "-c", SOURCE_HASH_SCRIPT],
+        cwd=ROOT_FOLDER,
+        env={**os.environ, "PYTHONHASHSEED": str(seed)},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def main():
+    checker = Checker()
+    hashes = {get_source_hash(seed) for seed in range(3)}
+    checker.check("deterministic", len(hashes) == 1)
+
+    if get_dot_version() is None:
+        print("Skipping render cache checks: graphviz dot isn't installed")
+        checker.exit()
+
+    graph, _ = api.run(os.path.join(ROOT_FOLDER, "gct", "api.py"))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        stats = Stats()
+        first = api.render(graph, stats=stats, cache_dir=cache_dir)
+        second = api.render(graph, stats=stats, cache_dir=cache_dir)
+        counters = stats.to_dict()["counters"]
+        checker.check("render cache hit", counters.get("render_cache_hits") == 1)
+        checker.check("cached output", first == second)
+
+        graph.edge("run", "render")  # changed graph
+        third = api.render(graph, stats=stats, cache_dir=cache_dir)
+        counters = stats.to_dict()["counters"]
+        checker.check("changed graph", counters.get("render_cache_misses") == 2)
+
+        file_path = os.path.join(cache_dir, "output", "graph")
+        api.render(graph, file_path, "svg", False, stats, cache_dir)
+        counters = stats.to_dict()["counters"]
+        with open(f"{file_path}.svg") as f:
+            checker.check(
+                "cached file", counters["render_cache_hits"] == 2 and f.read() == third
+            )
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
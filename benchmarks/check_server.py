@@ -0,0 +1,130 @@
+"""
+Check the GCT server (`python -m gct serve`), started in-process on a free port:
+1. code, local paths and formats are answered, invalid requests with an error status.
+2. paths outside of the server's root folder are rejected.
+3. requests beyond the workers and queue are rejected with 503, not left hanging.
+4. a warm request is faster than running `python -m gct` from scratch.
+Exits with a non-zero status if any check fails.
+
+Usage:
+>>> python benchmarks/check_server.py
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_FOLDER)
+
+from gct.server import GCTServer
+from checks import Checker
+
+MAX_WORKERS = 2
+MAX_QUEUE_SIZE = 1
+CODE = "def a():\n    b()\n\ndef b():\n    pass\n\ndef c():\n    pass\n"
+
+
+def request(host: str, path: str, body: dict = None) -> "tuple[int, bytes]":
+    """Status and body of a GET (or POST if `body` is given) request."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    try:
+        with urllib.request.urlopen(f"{host}{path}", data, timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def main():
+    checker = Checker()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = GCTServer(
+            ("127.0.0.1", 0),
+            MAX_WORKERS,
+            MAX_QUEUE_SIZE,
+            cache_dir=cache_dir,
+            root=ROOT_FOLDER,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        host = f"http://127.0.0.1:{port}"
+
+        status, body = request(host, "/health")
+        checker.check("health", status == 200 and json.loads(body)["status"] == "ok")
+
+        status, body = request(host, "/graph", {"code": CODE, "format": "json"})
+        graph = json.loads(body) if status == 200 else {}
+        checker.check("code to json", len(graph.get("edges", [])) == 1)
+
+        status, body = request(host, "/graph", {"code": CODE, "format": "dot"})
+        checker.check("code to dot", status == 200 and body.startswith(b"digraph"))
+
+        status, body = request(
+            host, "/graph", {"code": CODE, "format": "json", "focus": "c"}
+        )
+        graph = json.loads(body) if status == 200 else {}
+        checker.check("focus", status == 200 and not graph.get("edges"))
+
+        status, _ = request(host, "/graph?path=gct/api.py&format=json")
+        checker.check("path", status == 200)
+        status, _ = request(host, "/graph?path=../etc/passwd&format=json")
+        checker.check("path outside of root", status == 403)
+        status, _ = request(host, "/graph", {"code": "def (:", "format": "json"})
+        checker.check("syntax error", status == 400)
+        status, _ = request(host, "/graph", {"code": CODE, "format": "gif"})
+        checker.check("unsupported format", status == 400)
+        status, _ = request(host, "/graph", {"code": CODE, "focus": "missing"})
+        checker.check("unknown focus", status == 400)
+
+        if server.dot_version is not None:
+            status, body = request(host, "/graph", {"code": CODE, "format": "svg"})
+            checker.check("code to svg", status == 200 and b"<svg" in body)
+
+        # idle connections hold every worker and queue slot. The slots of the requests
+        # above are released after their responses are sent, wait for them first
+        time.sleep(0.2)
+        idle = [
+            socket.create_connection(("127.0.0.1", port))
+            for _ in range(MAX_WORKERS + MAX_QUEUE_SIZE)
+        ]
+        time.sleep(0.2)
+        status, _ = request(host, "/health")
+        checker.check("rejected when full", status == 503)
+        for connection in idle:
+            connection.close()
+        time.sleep(0.2)
+        status, _ = request(host, "/health")
+        checker.check("accepted after draining", status == 200)
+
+        start_time = time.perf_counter()
+        request(host, "/graph?path=gct/api.py&format=json")
+        warm_time = time.perf_counter() - start_time
+        with tempfile.TemporaryDirectory() as destination_folder:
+            start_time = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "gct", "-i", "gct/api.py", "-f", "json"]
+                + ["-d", destination_folder],
+                cwd=ROOT_FOLDER,
+                check=True,
+                capture_output=True,
+            )
+            cold_time = time.perf_counter() - start_time
+        print(
+            f"warm request: {warm_time * 1000:.1f}ms, "
+            f"cold run: {cold_time * 1000:.1f}ms"
+        )
+        checker.check("warm request", warm_time < cold_time)
+
+        server.shutdown()
+        server.server_close()
+    checker.exit()
+
+
+if __name__ == "__main__":
+    main()
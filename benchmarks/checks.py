@@ -0,0 +1,27 @@
+"""
+Reporting shared by the `check_*.py` scripts: every check prints OK/FAIL, and the
+script exits with a non-zero status if any of them failed.
+
+Usage:
+>>> from checks import Checker
+>>> checker = Checker()
+>>> checker.check("name", condition)
+>>> checker.exit()
+"""
+import sys
+
+
+class Checker:
+    """Prints the outcome of every check and remembers whether any of them failed."""
+
+    def __init__(self):
+        self.ok = True
+
+    def check(self, name: str, condition: bool) -> bool:
+        print(f"{'OK' if condition else 'FAIL'} {name}")
+        self.ok &= condition
+        return condition
+
+    def exit(self):
+        """Exit with status 0 if every check passed, 1 otherwise."""
+        sys.exit(0 if self.ok else 1)
@@ -0,0 +1,133 @@
+"""
+Generator of synthetic python modules for benchmarking GCT.
+Every knob that affects GCT's cost can be set: number of classes/functions, nesting
+depth, call density, `self.` vs bare calls and reassigned variables. The output is
+deterministic for a given seed.
+
+Usage:
+>>> python benchmarks/generate.py --num_classes 100 --nesting_depth 2 > synthetic.py
+"""
+import argparse
+import random
+from collections import namedtuple
+
+
+class GeneratorConfig(
+    namedtuple(
+        "GeneratorConfig",
+        [
+            "num_classes",
+            "methods_per_class",
+            "num_functions",
+            "nesting_depth",
+            "call_density",
+            "self_call_ratio",
+            "num_reassigned",
+            "seed",
+        ],
+    )
+):
+    num_classes: int  # number of classes
+    methods_per_class: int  # number of methods in each class
+    num_functions: int  # number of module-level functions
+    nesting_depth: int  # depth of nested functions inside every method/function
+    call_density: int  # number of calls in every function body
+    self_call_ratio: float  # fraction of calls inside methods that are `self.` calls
+    num_reassigned: int  # variables reassigned to instances of different classes
+    seed: int
+
+
+DEFAULT_CONFIG = GeneratorConfig(
+    num_classes=10,
+    methods_per_class=10,
+    num_functions=10,
+    nesting_depth=1,
+    call_density=3,
+    self_call_ratio=0.5,
+    num_reassigned=2,
+    seed=0,
+)
+
+
+def _generate_body(
+    config: GeneratorConfig,
+    rng: random.Random,
+    indent: str,
+    name: str,
+    depth: int,
+    class_index: int = None,
+) -> "list[str]":
+    lines = []
+    if depth < config.nesting_depth:
+        # nested functions are named after their parent, so calls to them are unambiguous
+        inner_name = f"{name}_inner_{depth}"
+        lines.append(f"{indent}def {inner_name}(x):")
+        lines.extend(
+            _generate_body(config, rng, indent + "    ", inner_name, depth + 1)
+        )
+        lines.append(f"{indent}x = {inner_name}(x)")
+
+    for i in range(config.num_reassigned):
+        classes = [rng.randrange(max(config.num_classes, 1)) for _ in range(2)]
+        if config.num_classes:
+            lines.append(f"{indent}var_{i} = Class_{classes[0]}()")
+            lines.append(f"{indent}var_{i} = Class_{classes[1]}()")
+            method = rng.randrange(max(config.methods_per_class, 1))
+            lines.append(f"{indent}var_{i}.method_{method}(x)")
+
+    for _ in range(config.call_density):
+        is_self_call = (
+            class_index is not None
+            and config.methods_per_class
+            and rng.random() < config.self_call_ratio
+        )
+        if is_self_call:
+            lines.append(
+                f"{indent}x = self.method_{rng.randrange(config.methods_per_class)}(x)"
+            )
+        elif config.num_functions:
+            lines.append(f"{indent}x = function_{rng.randrange(config.num_functions)}(x)")
+
+    lines.append(f"{indent}return x")
+    return lines
+
+
+def generate_module(config: GeneratorConfig = DEFAULT_CONFIG) -> str:
+    """Generate the source code of a synthetic module."""
+    rng = random.Random(config.seed)
+    lines = ['"""Synthetic module generated by benchmarks/generate.py"""', ""]
+
+    for i in range(config.num_functions):
+        lines.append(f"def function_{i}(x):")
+        lines.extend(_generate_body(config, rng, "    ", f"function_{i}", 0))
+        lines.append("")
+
+    for i in range(config.num_classes):
+        lines.append(f"class Class_{i}:")
+        for j in range(config.methods_per_class):
+            lines.append(f"    def method_{j}(self, x):")
+            lines.extend(
+                _generate_body(
+                    config, rng, "        ", f"method_{i}_{j}", 0, class_index=i
+                )
+            )
+            lines.append("")
+        if not config.methods_per_class:
+            lines.append("    pass")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    for field, default in DEFAULT_CONFIG._asdict().items():
+        parser.add_argument(
+            f"--{field}", type=type(default), default=default, dest=field
+        )
+    args = vars(parser.parse_args())
+    print(generate_module(GeneratorConfig(**args)))
+
+
+if __name__ == "__main__":
+    main()
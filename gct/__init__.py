@@ -22,8 +22,5 @@ ERRORS = {
     ID_ERROR: "to-do id error",
 }
 
-
-# Make sure that all python packages are installed
-from .package_config import installer
-
-installer()
+# Importing gct does no subprocess work. Graphviz is only probed when rendering,
+# see `package_config.ensure_dot_installed`.
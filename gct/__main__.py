@@ -1,14 +1,38 @@
 """ 
 Wrapper around api.py to run GCT on any file/URL.
 """
+import glob
+import json
+import logging
+import os
 import sys
+import time
+import urllib.parse
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append("../gct")
 
 import gct.api as api
+from gct.directory import extract_files, get_module_name
 from gct.url import fetch_valid_url
+from gct.watch import watch, Watcher
+from gct.export import EXPORT_FORMATS
+from gct.stats import Stats
+from gct.lod import LODConfig
+import gct.export as exporter
+import gct.focus as focuser
+import gct.remote as remote
 import argparse
-from gct.constants import TEMP_FOLDER, GRAPH_FOLDER_DEFAULT_NAME
+from gct.constants import (
+    TEMP_FOLDER,
+    GRAPH_FOLDER_DEFAULT_NAME,
+    LOD_MAX_NODES,
+    LOD_MAX_EDGES,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_MAX_QUEUE_SIZE,
+)
 from gct import __version__
 
 parser = argparse.ArgumentParser()
@@ -17,7 +41,19 @@ parser.add_argument(
     "-i",
     type=str,
     required=True,
-    help="File path or URL to visualize",
+    action="append",
+    help="File path, folder path or URL (file or GitHub folder) to visualize. "
+    "Repeat it or use a glob (e.g. 'src/**/*.py') for many inputs, "
+    "or '-' to read a newline-delimited list of inputs from stdin",
+)
+
+parser.add_argument(
+    "--jobs",
+    "-j",
+    type=int,
+    default=None,
+    help="With many inputs, number of inputs processed in parallel. "
+    "Defaults to the number of cores",
 )
 
 parser.add_argument(
@@ -28,6 +64,92 @@ parser.add_argument(
     help="Folder path to save resulting GCT graph to",
 )
 
+parser.add_argument(
+    "--format",
+    "-f",
+    type=str,
+    default="pdf",
+    choices=["pdf", "svg", "png", *EXPORT_FORMATS],
+    help="Output format. json and dot are exported without graphviz (no layout)",
+)
+
+parser.add_argument(
+    "--cache_dir",
+    "-c",
+    type=str,
+    default=None,
+    help="Folder to cache extraction results and rendered graphs in. "
+    "Unchanged files are not re-parsed and unchanged graphs are not laid out again",
+)
+
+parser.add_argument(
+    "--per_module",
+    action="store_true",
+    help="For folders, render one graph per module instead of a single package graph",
+)
+
+parser.add_argument(
+    "--render_workers",
+    type=int,
+    default=None,
+    help="Maximum number of concurrent dot processes. Defaults to the number of cores",
+)
+
+parser.add_argument(
+    "--render_timeout",
+    type=float,
+    default=None,
+    help="Seconds after which a single graph layout is aborted",
+)
+
+parser.add_argument(
+    "--watch",
+    "-w",
+    action="store_true",
+    help="Watch the file/folder and re-render the graph whenever it changes",
+)
+
+parser.add_argument(
+    "--lod",
+    action="store_true",
+    help="Reduce graphs larger than --max_nodes/--max_edges before layout, "
+    "collapsing classes, nested functions and parallel edges",
+)
+
+parser.add_argument(
+    "--max_nodes",
+    type=int,
+    default=LOD_MAX_NODES,
+    help="With --lod, maximum number of nodes to lay out",
+)
+
+parser.add_argument(
+    "--max_edges",
+    type=int,
+    default=LOD_MAX_EDGES,
+    help="With --lod, maximum number of edges to lay out",
+)
+
+parser.add_argument(
+    "--focus",
+    type=str,
+    default=None,
+    help="Only graph the callers/callees of this function/class, e.g. Class.method",
+)
+
+parser.add_argument(
+    "--depth",
+    type=int,
+    default=1,
+    help="With --focus, maximum number of calls away from the focused function/class",
+)
+
+parser.add_argument(
+    "--stats",
+    action="store_true",
+    help="Print the duration of every phase and other counters as JSON",
+)
+
 parser.add_argument(
     "--version",
     "-v",
@@ -36,23 +158,461 @@ parser.add_argument(
 )
 
 
-def main():
-    args = parser.parse_args()
+serve_parser = argparse.ArgumentParser(
+    prog="python -m gct serve",
+    description="Serve graphs over HTTP, keeping caches and graphviz warm",
+)
+serve_parser.add_argument("--host", type=str, default=SERVER_HOST)
+serve_parser.add_argument("--port", "-p", type=int, default=SERVER_PORT)
+serve_parser.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of requests handled concurrently. Defaults to the number of cores",
+)
+serve_parser.add_argument(
+    "--queue_size",
+    type=int,
+    default=SERVER_MAX_QUEUE_SIZE,
+    help="Number of requests waiting for a worker before new requests are rejected",
+)
+serve_parser.add_argument(
+    "--cache_dir",
+    "-c",
+    type=str,
+    default=None,
+    help="Folder to cache extraction results, downloads and rendered graphs in",
+)
+serve_parser.add_argument(
+    "--root",
+    type=str,
+    default=None,
+    help="Folder of the local files that can be requested by path. "
+    "If not set, only code and URLs are accepted",
+)
+
+
+def get_lod(args: argparse.Namespace) -> LODConfig:
+    """Level of detail thresholds. None if --lod isn't set."""
+    if not args.lod:
+        return None
+    return LODConfig(max_nodes=args.max_nodes, max_edges=args.max_edges)
+
+
+def watch_and_render(args: argparse.Namespace):
+    """Re-render the graph every time the watched file/folder changes."""
+    if not (os.path.isdir(args.input) or args.input.endswith(".py")):
+        parser.error("--watch requires a local python file or folder")
+
+    is_first_render = True
+
+    def on_change(watcher: Watcher):
+        nonlocal is_first_render
+        file_path = f"{args.destination_folder}/{GRAPH_FOLDER_DEFAULT_NAME}"
+        graphs = watcher.get_graphs()
+        if args.focus is not None:
+            try:
+                graphs = focuser.focus(*graphs, args.focus, args.depth)
+            except ValueError as e:  # the focused symbol may have been renamed
+                print(e)
+                return
+
+        if args.format in EXPORT_FORMATS:
+            os.makedirs(args.destination_folder, exist_ok=True)
+            with open(f"{file_path}.{args.format}", "w") as f:
+                exporter.export(*graphs, args.format, f)
+            print(f"Exported graph for {args.input}")
+            return
+
+        try:
+            graph = api.to_graphviz(*graphs, get_lod(args))
+        except Exception as e:
+            print(e)
+            return
+        api.render(
+            graph,
+            file_path=file_path,
+            output_format=args.format,
+            view=is_first_render,
+            cache_dir=args.cache_dir,
+        )
+        is_first_render = False
+        print(f"Rendered graph for {args.input}")
+
+    try:
+        watch(args.input, on_change, cache_dir=args.cache_dir)
+    except KeyboardInterrupt:
+        pass
+
+
+def export_modules(args: argparse.Namespace):
+    """Export one graph per module of a folder, without graphviz."""
+    os.makedirs(args.destination_folder, exist_ok=True)
+    for extraction in extract_files(args.input, cache_dir=args.cache_dir):
+        if extraction.error is not None:
+            print(f"Skipping {extraction.path}: {extraction.error}")
+            continue
+        module_name = get_module_name(args.input, extraction.path)
+        file_path = f"{args.destination_folder}/{module_name}.{args.format}"
+        with open(file_path, "w") as f:
+            exporter.export(*extraction.to_graphs(), args.format, f)
+        print(f"Exported {module_name} to {file_path}")
+
+
+def render_modules(args: argparse.Namespace):
+    """Render one graph per module of a folder, laying them out concurrently."""
+    if args.format in EXPORT_FORMATS:
+        export_modules(args)
+        return
+
+    modules = api.run_modules(args.input, cache_dir=args.cache_dir, lod=get_lod(args))
+    results = api.render_batch(
+        [graph for _, graph in modules],
+        [f"{args.destination_folder}/{module_name}" for module_name, _ in modules],
+        output_format=args.format,
+        max_workers=args.render_workers,
+        timeout=args.render_timeout,
+        cache_dir=args.cache_dir,
+    )
+    for (module_name, _), result in zip(modules, results):
+        if result.error is not None:
+            print(f"Failed to render {module_name}: {result.error}")
+        else:
+            print(f"Rendered {module_name} to {result.output}")
+
+
+def render_urls(
+    args: argparse.Namespace,
+    urls: "list[str]",
+    stats: Stats = None,
+    file_path: str = None,
+    view: bool = None,
+    max_workers: int = None,
+):
+    """Render (or export) a single graph of many remote files, downloaded concurrently."""
+    file_path = file_path or f"{args.destination_folder}/{GRAPH_FOLDER_DEFAULT_NAME}"
+    if args.format in EXPORT_FORMATS:
+        os.makedirs(args.destination_folder, exist_ok=True)
+        extractions = remote.extract_urls(urls, args.cache_dir, max_workers=max_workers)
+        graphs = remote.merge_urls(extractions)
+        if args.focus is not None:
+            graphs = focuser.focus(*graphs, args.focus, args.depth)
+        with open(f"{file_path}.{args.format}", "w") as f:
+            exporter.export(*graphs, args.format, f)
+        return
+
+    graph = api.run_urls(
+        urls,
+        cache_dir=args.cache_dir,
+        max_workers=max_workers,
+        stats=stats,
+        lod=get_lod(args),
+        focus=args.focus,
+        depth=args.depth,
+    )
+    api.render(
+        graph,
+        file_path=file_path,
+        output_format=args.format,
+        view=view,
+        stats=stats,
+        cache_dir=args.cache_dir,
+    )
+
+
+def render_input(
+    args: argparse.Namespace,
+    stats: Stats = None,
+    file_path: str = None,
+    view: bool = None,
+    max_workers: int = None,
+):
+    """
+    Render (or export) a single graph of a file, URL or folder.
+    @Parameters:
+    1. args: argparse.Namespace = parsed arguments, `args.input` being a single input.
+    2. stats: Stats = records the duration of every phase and counters. Optional.
+    3. file_path: str = output path, without extension. Defaults to the graph file of
+    the destination folder.
+    4. view: bool = open the rendered file in a viewer. Defaults to True.
+    5. max_workers: int = number of extraction processes for folders and GitHub trees.
+    Defaults to the number of cores.
+    """
+    file_path = file_path or f"{args.destination_folder}/{GRAPH_FOLDER_DEFAULT_NAME}"
+
+    if os.path.isdir(args.input):
+        if args.format in EXPORT_FORMATS:
+            api.export(
+                args.input,
+                args.format,
+                f"{file_path}.{args.format}",
+                cache_dir=args.cache_dir,
+                stats=stats,
+                focus=args.focus,
+                depth=args.depth,
+                max_workers=max_workers,
+            )
+            return
+
+        graph = api.run_package(
+            args.input,
+            max_workers=max_workers,
+            cache_dir=args.cache_dir,
+            stats=stats,
+            lod=get_lod(args),
+            focus=args.focus,
+            depth=args.depth,
+        )
+        api.render(
+            graph,
+            file_path=file_path,
+            output_format=args.format,
+            view=view,
+            stats=stats,
+            cache_dir=args.cache_dir,
+        )
+        return
+
+    if remote.is_github_tree_url(args.input):
+        urls = remote.list_github_tree(args.input, args.cache_dir)
+        render_urls(args, urls, stats, file_path, view, max_workers)
+        return
 
     # Download file if URL is valid
-    status = fetch_valid_url(args.input)
-    path = status["url"]
+    status = fetch_valid_url(args.input, args.cache_dir)
+    path, source = status["url"], status["body"]
     if not status["valid"]:
         path = args.input
 
-    graph, _ = api.run(path)
+    if args.format in EXPORT_FORMATS:
+        api.export(
+            path,
+            args.format,
+            f"{file_path}.{args.format}",
+            cache_dir=args.cache_dir,
+            stats=stats,
+            focus=args.focus,
+            depth=args.depth,
+            source=source,
+        )
+        return
+
+    graph, _ = api.run(
+        path,
+        cache_dir=args.cache_dir,
+        stats=stats,
+        lod=get_lod(args),
+        focus=args.focus,
+        depth=args.depth,
+        source=source,
+    )
 
     api.render(
         graph,
-        file_path=f"{args.destination_folder}/{GRAPH_FOLDER_DEFAULT_NAME}",
-        output_format="pdf",
+        file_path=file_path,
+        output_format=args.format,
+        view=view,
+        stats=stats,
+        cache_dir=args.cache_dir,
     )
 
 
+class BatchResult(
+    namedtuple("BatchResult", ["input", "output", "seconds", "error", "stats"])
+):
+    input: str
+    output: str  # path of the rendered/exported file
+    seconds: float
+    error: str  # None if the input was rendered successfully
+    stats: dict  # see Stats.to_dict, None unless --stats is set
+
+
+def get_inputs(patterns: "list[str]") -> "list[str]":
+    """
+    Expand the --input arguments: `-` reads a newline-delimited list of inputs from stdin
+    and local globs are expanded (sorted). Duplicates are dropped.
+    Globs that don't match anything are kept as is, and fail like any missing file.
+    """
+    inputs: "list[str]" = []
+    for pattern in patterns:
+        if pattern == "-":
+            inputs.extend(line.strip() for line in sys.stdin if line.strip())
+        elif not pattern.startswith("http") and glob.has_magic(pattern):
+            inputs.extend(sorted(glob.glob(pattern, recursive=True)) or [pattern])
+        else:
+            inputs.append(pattern)
+    return list(dict.fromkeys(inputs))
+
+
+def _get_name_parts(resource: str) -> "list[str]":
+    """Components of the path (or host and path) of an input, without the extension."""
+    if resource.startswith("http"):
+        parsed = urllib.parse.urlparse(resource)
+        parts = [parsed.netloc, *parsed.path.split("/")]
+    else:
+        parts = os.path.abspath(resource).split(os.sep)
+    parts = [part for part in parts if part]
+    if parts and parts[-1].endswith(".py"):
+        parts[-1] = parts[-1][: -len(".py")]
+    return parts or ["graph"]
+
+
+def get_output_names(inputs: "list[str]") -> "list[str]":
+    """
+    Collision-free output file names (without extension) for `inputs`, e.g. `api` for
+    `gct/api.py`. Inputs with the same name are told apart by their parent folders
+    (`a.api`, `b.api`), then by a counter (`api`, `api-2`).
+    """
+    parts = [_get_name_parts(resource) for resource in inputs]
+    depths = [1] * len(inputs)
+    while True:
+        names = [".".join(p[-depth:]) for p, depth in zip(parts, depths)]
+        # inputs sharing a name, unless they're the same path
+        paths: "dict[str, set[tuple[str, ...]]]" = defaultdict(set)
+        for name, p in zip(names, parts):
+            paths[name].add(tuple(p))
+        is_updated = False
+        for i, name in enumerate(names):
+            if len(paths[name]) > 1 and depths[i] < len(parts[i]):
+                depths[i] += 1
+                is_updated = True
+        if not is_updated:
+            break
+
+    used_names: "set[str]" = set()
+    output_names = []
+    for name in names:
+        output_name, n = name, 1
+        while output_name in used_names:
+            n += 1
+            output_name = f"{name}-{n}"
+        used_names.add(output_name)
+        output_names.append(output_name)
+    return output_names
+
+
+def _render_batch_job(
+    args: argparse.Namespace, resource: str, file_path: str
+) -> BatchResult:
+    """Render (or export) a single input of a batch. Runs in a worker process."""
+    args = argparse.Namespace(**{**vars(args), "input": resource})
+    stats = Stats() if args.stats else None
+    start_time = time.perf_counter()
+    try:
+        # inputs are already processed in parallel, so folders and remote files are
+        # extracted serially in this process, without a nested process pool
+        render_input(args, stats, file_path, view=False, max_workers=1)
+        error = None
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    return BatchResult(
+        resource,
+        f"{file_path}.{args.format}",
+        time.perf_counter() - start_time,
+        error,
+        stats.to_dict() if stats is not None else None,
+    )
+
+
+def render_inputs(args: argparse.Namespace, inputs: "list[str]") -> bool:
+    """
+    Render (or export) one graph per input, with --jobs inputs in parallel.
+    Outputs are written to the destination folder, without opening a viewer.
+    Prints every result as it's ready, then a summary in the order of `inputs`.
+    @Returns: True if every input was rendered successfully.
+    """
+    os.makedirs(args.destination_folder, exist_ok=True)
+    file_paths = [
+        os.path.join(args.destination_folder, name) for name in get_output_names(inputs)
+    ]
+    start_time = time.perf_counter()
+    results: "dict[str, BatchResult]" = {}
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [
+            executor.submit(_render_batch_job, args, resource, file_path)
+            for resource, file_path in zip(inputs, file_paths)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.input] = result
+            if result.error is None:
+                print(f"Rendered {result.input} to {result.output}")
+            else:
+                print(f"Failed to render {result.input}: {result.error}")
+    total_time = time.perf_counter() - start_time
+
+    failures = [result for result in results.values() if result.error is not None]
+    print(
+        f"\n{len(inputs)} inputs: {len(inputs) - len(failures)} rendered, "
+        f"{len(failures)} failed in {total_time:.2f}s"
+    )
+    for resource in inputs:
+        result = results[resource]
+        status = "OK" if result.error is None else "FAIL"
+        detail = result.output if result.error is None else result.error.splitlines()[0]
+        print(f"{status:<5}{result.seconds:>8.2f}s  {resource}: {detail}")
+
+    if args.stats:
+        print(
+            json.dumps(
+                {resource: results[resource].stats for resource in inputs}, indent=2
+            )
+        )
+    return not failures
+
+
+def serve(argv: "list[str]"):
+    """Run the GCT server, see `gct.server`."""
+    import gct.server as server
+
+    args = serve_parser.parse_args(argv)
+    server.serve(
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers,
+        max_queue_size=args.queue_size,
+        cache_dir=args.cache_dir,
+        root=args.root,
+    )
+
+
+def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+
+    args = parser.parse_args()
+    if args.lod:  # report what was collapsed
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    inputs = get_inputs(args.input)
+    if not inputs:
+        parser.error("no input given")
+    if len(inputs) > 1:
+        if args.watch or args.per_module:
+            parser.error("--watch and --per_module take a single input")
+        if not render_inputs(args, inputs):
+            sys.exit(1)
+        return
+    args.input = inputs[0]
+
+    if args.watch:
+        watch_and_render(args)
+        return
+
+    if os.path.isdir(args.input) and args.per_module:
+        if args.focus is not None:
+            parser.error("--focus can't be combined with --per_module")
+        render_modules(args)
+        return
+
+    stats = Stats() if args.stats else None
+    try:
+        render_input(args, stats)
+    finally:
+        if stats is not None:
+            print(stats.to_json(indent=2))
+
+
 if __name__ == "__main__":
     main()
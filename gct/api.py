@@ -22,40 +22,385 @@ Running GCT on any python3 file is as simple as:
 >>> api.render(graph, file_name="temp/graph", output_format="pdf")
 
 If you want to load the svg object in memory instead of saving it to a file, 
-leave `file_name` in api.run as None.
->>> svg_as_string = api.run(graph)
+leave `file_name` in api.render as None. The output is piped from `dot`, so
+nothing is written to disk and `run`/`render` can be called from multiple threads.
+>>> svg_as_string = api.render(graph)
 
-"""
-import graphviz
+Extraction results can be cached on disk, keyed by a hash of the source code.
+Re-running GCT on unchanged files then skips parsing and extraction:
+>>> graph, code = api.run(path, cache_dir=".gct_cache")
+
+Output is deterministic (node ids and colors only depend on the code), so rendered
+graphs can be cached too, keyed by their DOT source. Unchanged graphs skip `dot`:
+>>> svg_as_string = api.render(graph, cache_dir=".gct_cache")
+
+A whole package can be traced with `run_package`. Every file is extracted in
+parallel and rendered as its own module cluster (calls are still traced per file):
+>>> graph = api.run_package("path/to/package/")
+
+The graph can also be exported as JSON (nested clusters and edges) or DOT without
+graphviz installed, skipping the layout step entirely:
+>>> json_as_string = api.export(path, output_format="json")
+
+Many graphs can be laid out concurrently, by a bounded pool of `dot` processes:
+>>> modules = api.run_modules("path/to/package/")
+>>> results = api.render_batch([graph for _, graph in modules], timeout=60)
+
+Many remote files, e.g. every python file of a GitHub folder, are downloaded
+concurrently and extracted as they arrive:
+>>> import gct.remote as remote
+>>> urls = remote.list_github_tree("https://github.com/owner/repo/tree/main/package")
+>>> graph = api.run_urls(urls)
 
+To lay out only the neighborhood of one function, i.e. its callers and callees up to
+`depth` calls away, and the classes/functions containing them:
+>>> graph, code = api.run(path, focus="Class.method", depth=2)
+
+Library calls are quiet. To see where time goes, pass a `Stats` object; it collects
+the duration of every phase (parse, node creation, call resolution, rendering etc.)
+and counters such as call sites and cache hits:
+>>> from gct.stats import Stats
+>>> stats = Stats()
+>>> graph, code = api.run(path, stats=stats)
+>>> svg_as_string = api.render(graph, stats=stats)
+>>> stats.to_json()
+
+"""
 import gct.utils as utils
+import gct.package_config as package_config
 from gct.parse import extract
-import time
-from gct.constants import TEMP_FOLDER, GRAPH_FOLDER_DEFAULT_NAME
+from gct.network import Graph, FileExtraction
+from gct.source import SourceBuffer
+from gct.directory import extract_directory, extract_files, get_module_name
+from gct.cache import RenderCache, get_cache, get_render_cache
+from gct.stats import Stats, count, logger, phase
+from gct.lod import LODConfig, reduce_graph
+import gct.export as exporter
+import gct.focus as focuser
+import gct.remote as remote
+import math
+import os
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
+# Formats returned as str by `render`. Every other format is returned as bytes.
+TEXT_OUTPUT_FORMATS = {"svg", "dot", "gv", "canon", "plain", "json", "xdot"}
 
-def run(resource_name: str) -> "list[graphviz.Digraph, str]":
+
+def run(
+    resource_name: str,
+    cache_dir: str = None,
+    stats: Stats = None,
+    lod: LODConfig = None,
+    focus: str = None,
+    depth: int = 1,
+    source: str = None,
+) -> "list[graphviz.Digraph, str]":
     """
     Runs GCT on a given resource and returns the graphviz object.
     @Parameter:
     1. resource_name: str = Path to the file/URL to generate graph for.
+    2. cache_dir: str = Folder of the extraction cache. If None, caching is disabled.
+    3. stats: Stats = records the duration of every phase and counters. Optional.
+    4. lod: LODConfig = node/edge thresholds above which the graph is reduced before layout.
+    If None, the graph is never reduced. See `gct.lod`.
+    5. focus: str = only keep the callers/callees of this function/class, e.g. `Class.method`.
+    If None, the whole graph is kept. See `gct.focus`.
+    6. depth: int = with `focus`, maximum number of calls away from the focused symbol.
+    7. source: str = Code of `resource_name`, if already read, e.g. the body returned by
+    `url.fetch_valid_url`. If None, the code is read from `resource_name`.
     @Returns:
     1. graphviz.Digraph object. To render the graph, call the render() method on the object.
     2. str: The raw code corresponding to `resource_name`.
     """
-    # Flush temp folder. If it doesn't exist, create it.
-    utils.flush(f"{TEMP_FOLDER}/")
+    node_representation, edge_representation, raw_code = extract_resource(
+        resource_name, cache_dir, stats, source
+    )
+    code = raw_code.text
+    if raw_code is not source:
+        raw_code.close()
+    if focus is not None:
+        node_representation, edge_representation = focuser.focus(
+            node_representation, edge_representation, focus, depth
+        )
+    with phase(stats, "graphviz"):
+        g = to_graphviz(node_representation, edge_representation, lod)
 
-    start_time = time.time()
+    return g, code
+
+
+def extract_resource(
+    resource_name: str,
+    cache_dir: str = None,
+    stats: Stats = None,
+    source: "str | SourceBuffer" = None,
+) -> "tuple[Graph, Graph, SourceBuffer]":
+    """
+    Extracts the node and edge representations of a file/URL/raw code.
+    @Parameter:
+    1. resource_name: str = Path to the file/URL to extract.
+    2. cache_dir: str = Folder of the extraction cache. If None, caching is disabled.
+    3. stats: Stats = records the duration of every phase and counters. Optional.
+    4. source: str | SourceBuffer = Code of `resource_name`, if already read. If None, the
+    code is read from `resource_name`.
+    @Returns: node (containment) graph, edge (call) graph and lines of code (a `SourceBuffer`).
+    If `source` is None, the buffer is read here and the caller closes it when done, see
+    `SourceBuffer.close`.
+    """
+    if source is not None:
+        if isinstance(source, str):
+            source = SourceBuffer(source)
+        return (*_extract_source(resource_name, source, cache_dir, stats), source)
+
+    with phase(stats, "read"):
+        source = utils.read_source_buffer(resource_name, cache_dir)
+    try:
+        graphs = _extract_source(resource_name, source, cache_dir, stats)
+    except BaseException:
+        source.close()  # read here, the caller never gets it
+        raise
+    return (*graphs, source)
+
+
+def _extract_source(
+    resource_name: str, source: SourceBuffer, cache_dir: str = None, stats: Stats = None
+) -> "tuple[Graph, Graph]":
+    """Extract the code of `resource_name`, see `extract_resource`."""
+    cache = get_cache(cache_dir) if cache_dir else None
+    extraction: FileExtraction = None
+    if cache:
+        key = cache.get_key(source.source)
+        extraction = cache.get(key)
+        if extraction is None:
+            count(stats, "extraction_cache_misses")
+        else:
+            count(stats, "extraction_cache_hits")
+
+    if extraction is not None:
+        node_representation, edge_representation = extraction.to_graphs()
+        return node_representation, edge_representation
 
     # Get the AST and raw code
-    tree, raw_code = utils.parse_file(resource_name)
+    with phase(stats, "parse"):
+        if resource_name.startswith("http") or resource_name.endswith(".py"):
+            tree, raw_code = utils.parse_source(source, filename=resource_name)
+        else:
+            tree, raw_code = utils.parse_source(source)
     # Extract relevant components -- node connection and edge mapping
-    node_representation, edge_representation = extract(tree, raw_code)
+    node_representation, edge_representation = extract(tree, raw_code, stats=stats)
+    if cache:
+        cache.set(
+            key,
+            FileExtraction.from_graphs(
+                resource_name, node_representation, edge_representation
+            ),
+        )
+    return node_representation, edge_representation
+
+
+def export(
+    resource_name: str,
+    output_format: str = "json",
+    file_path: str = None,
+    cache_dir: str = None,
+    stats: Stats = None,
+    focus: str = None,
+    depth: int = 1,
+    max_workers: int = None,
+    source: str = None,
+) -> str:
+    """
+    Runs GCT on a file/URL/folder and exports the graph as JSON or DOT, without graphviz.
+    No graphviz object is built and no layout is computed.
+    @Parameter:
+    1. resource_name: str = Path to the file/URL/folder to export graph for.
+    2. output_format: str = "json" (nested clusters and edges) or "dot".
+    3. file_path: str = File path to stream the output to. If None, the output is returned.
+    4. cache_dir: str = Folder of the extraction cache. If None, caching is disabled.
+    5. stats: Stats = records the duration of every phase and counters. Optional.
+    6. focus: str = only keep the callers/callees of this function/class, e.g. `Class.method`.
+    If None, the whole graph is kept. See `gct.focus`.
+    7. depth: int = with `focus`, maximum number of calls away from the focused symbol.
+    8. max_workers: int = For folders, number of worker processes. Defaults to the number of cores.
+    9. source: str = For files/URLs, code of `resource_name` if already read. If None, the
+    code is read from `resource_name`.
+    @Returns: the exported graph if `file_path` is None, otherwise an empty string.
+    """
+    if os.path.isdir(resource_name):
+        with phase(stats, "extract"):
+            node_representation, edge_representation = extract_directory(
+                resource_name, max_workers, cache_dir
+            )
+    else:
+        node_representation, edge_representation, raw_code = extract_resource(
+            resource_name, cache_dir, stats, source
+        )
+        if raw_code is not source:
+            raw_code.close()
+    if focus is not None:
+        node_representation, edge_representation = focuser.focus(
+            node_representation, edge_representation, focus, depth
+        )
+
+    if file_path is None:
+        return exporter.export(
+            node_representation, edge_representation, output_format
+        )
+
+    folder = os.path.dirname(file_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(file_path, "w") as f:
+        exporter.export(node_representation, edge_representation, output_format, f)
+    return ""
+
+
+def run_package(
+    resource_name: str,
+    max_workers: int = None,
+    cache_dir: str = None,
+    stats: Stats = None,
+    lod: LODConfig = None,
+    focus: str = None,
+    depth: int = 1,
+) -> "graphviz.Digraph":
+    """
+    Runs GCT on every python file of a folder and returns the graphviz object.
+    Files are extracted in parallel and each module is rendered as its own cluster.
+    @Parameter:
+    1. resource_name: str = Path to the folder to generate graph for.
+    2. max_workers: int = Number of worker processes. Defaults to the number of cores.
+    3. cache_dir: str = Folder of the extraction cache. If None, caching is disabled.
+    4. stats: Stats = records the duration of every phase. Optional. Files are extracted
+    in worker processes, so their extraction is timed as a single "extract" phase.
+    5. lod: LODConfig = node/edge thresholds above which the graph is reduced before layout.
+    If None, the graph is never reduced. See `gct.lod`.
+    6. focus: str = only keep the callers/callees of this function/class, e.g. `module/Class.method`.
+    If None, the whole graph is kept. See `gct.focus`.
+    7. depth: int = with `focus`, maximum number of calls away from the focused symbol.
+    @Returns:
+    1. graphviz.Digraph object. To render the graph, call the render() method on the object.
+    """
+    with phase(stats, "extract"):
+        node_representation, edge_representation = extract_directory(
+            resource_name, max_workers, cache_dir
+        )
+    if focus is not None:
+        node_representation, edge_representation = focuser.focus(
+            node_representation, edge_representation, focus, depth
+        )
+    with phase(stats, "graphviz"):
+        g = to_graphviz(node_representation, edge_representation, lod)
+
+    return g
+
+
+def run_urls(
+    urls: "list[str]",
+    cache_dir: str = None,
+    max_concurrency: int = remote.MAX_CONCURRENCY,
+    max_per_host: int = remote.MAX_PER_HOST,
+    max_workers: int = None,
+    stats: Stats = None,
+    lod: LODConfig = None,
+    focus: str = None,
+    depth: int = 1,
+) -> "graphviz.Digraph":
+    """
+    Runs GCT on many remote files and returns a single graphviz object, where every
+    file is a module cluster. Files are downloaded concurrently and each one is
+    extracted as soon as it arrives. See `gct.remote`.
+    @Parameter:
+    1. urls: list[str] = URLs of the python files. GitHub URLs are rewritten to raw URLs.
+    A GitHub tree (folder) URL can be expanded with `remote.list_github_tree`.
+    2. cache_dir: str = Folder of the HTTP and extraction caches. If None, caching is disabled.
+    3. max_concurrency: int = Maximum number of requests in flight.
+    4. max_per_host: int = Maximum number of requests in flight to a single host.
+    5. max_workers: int = Number of extraction processes. Defaults to the number of cores.
+    6. stats: Stats = records the duration of every phase. Optional. Downloads and
+    extraction overlap, so they're timed as a single "extract" phase.
+    7. lod: LODConfig = node/edge thresholds above which the graph is reduced before layout.
+    If None, the graph is never reduced. See `gct.lod`.
+    8. focus: str = only keep the callers/callees of this function/class, e.g. `module/Class.method`.
+    If None, the whole graph is kept. See `gct.focus`.
+    9. depth: int = with `focus`, maximum number of calls away from the focused symbol.
+    @Returns:
+    1. graphviz.Digraph object. To render the graph, call the render() method on the object.
+    """
+    with phase(stats, "extract"):
+        extractions = remote.extract_urls(
+            urls, cache_dir, max_concurrency, max_per_host, max_workers
+        )
+        node_representation, edge_representation = remote.merge_urls(extractions)
+    if focus is not None:
+        node_representation, edge_representation = focuser.focus(
+            node_representation, edge_representation, focus, depth
+        )
+    with phase(stats, "graphviz"):
+        g = to_graphviz(node_representation, edge_representation, lod)
+
+    return g
+
+
+def run_modules(
+    resource_name: str,
+    max_workers: int = None,
+    cache_dir: str = None,
+    lod: LODConfig = None,
+) -> "list[tuple[str, graphviz.Digraph]]":
+    """
+    Runs GCT on every python file of a folder and returns one graphviz object per module.
+    Files are extracted in parallel. Modules without functions/classes are skipped.
+    @Parameter:
+    1. resource_name: str = Path to the folder to generate graphs for.
+    2. max_workers: int = Number of worker processes. Defaults to the number of cores.
+    3. cache_dir: str = Folder of the extraction cache. If None, caching is disabled.
+    4. lod: LODConfig = node/edge thresholds above which a module graph is reduced before
+    layout. If None, graphs are never reduced. See `gct.lod`.
+    @Returns: list of (module name, graphviz.Digraph object), sorted by module path.
+    """
+    graphs = []
+    for extraction in extract_files(resource_name, max_workers, cache_dir):
+        if extraction.error is not None:
+            logger.warning("Skipping %s: %s", extraction.path, extraction.error)
+            continue
+        if not extraction.nodes:
+            continue
+        graphs.append(
+            (
+                get_module_name(resource_name, extraction.path),
+                to_graphviz(*extraction.to_graphs(), lod),
+            )
+        )
+    return graphs
+
+
+def to_graphviz(
+    node_representation: Graph, edge_representation: Graph, lod: LODConfig = None
+) -> "graphviz.Digraph":
+    """
+    Converts the extracted node and edge representations to a graphviz object.
+    @Parameters:
+    1. node_representation: Graph = node (containment) graph.
+    2. edge_representation: Graph = edge (call) graph.
+    3. lod: LODConfig = node/edge thresholds above which the graph is reduced first, so
+    layout time stays bounded. Merged calls are drawn as weighted edges. If None, the
+    graph is never reduced.
+    @Returns: graphviz.Digraph object.
+    """
+    import graphviz  # imported lazily to keep `import gct` fast
+
+    edge_weights = {}
+    if lod is not None:
+        node_representation, edge_representation, edge_weights, _ = reduce_graph(
+            node_representation, edge_representation, lod
+        )
+
     # Heirarchical clustering
     node_representation.group_nodes_by_level()
     # Define graphviz graph
-    g = graphviz.Digraph("G", filename=f"{TEMP_FOLDER}/graph", engine="dot")
+    g = graphviz.Digraph("G", engine="dot")
     g.attr(compound="true", rankdir="LR", ranksep="1.0")
 
     # Create visual graph representation
@@ -64,39 +409,180 @@ def run(resource_name: str) -> "list[graphviz.Digraph, str]":
         utils.add_subgraphs(node_representation, g, root)
 
         # create edges
-        edges = list(edge_representation.G.edges)
+        edges = edge_representation.get_edges()
         for u, v in edges:
-            g.edge(u.id, v.id)
+            weight = edge_weights.get((u, v), 1)
+            if weight > 1:  # merged calls
+                penwidth = f"{1 + math.log2(weight):.1f}"
+                g.edge(u.id, v.id, label=str(weight), penwidth=penwidth)
+            else:
+                g.edge(u.id, v.id)
 
-        print(f"Successfully generated graph in {time.time() - start_time:.2f} seconds")
-        return g, "\n".join(raw_code)
+        return g
 
     raise Exception("No user-defined functions/class definitions found.")
 
 
 def render(
-    graph: graphviz.Digraph, file_path: str = None, output_format: str = "svg"
-) -> str:
+    graph: "graphviz.Digraph",
+    file_path: str = None,
+    output_format: str = "svg",
+    view: bool = None,
+    stats: Stats = None,
+    cache_dir: str = None,
+) -> "str | bytes":
     """
     Renders the graphviz object to a file.
+    Rendering is reentrant: nothing is written to disk unless `file_path` is given.
     @Parameters:
     1. graphviz_object: graphviz.Digraph = Graphviz object to render.
-    2. file_path: str = file path to save the output to. If None, the svg output (str) will be returned.
+    2. file_path: str = file path to save the output to. If None, the output is piped
+    from `dot` and returned in memory: str for text formats (e.g. svg), bytes otherwise.
     3. output_format: str = Output format. Defaults to svg. Other formats include "png", "pdf".
+    4. view: bool = Open the rendered file in a viewer. Defaults to True if `file_path` is given.
+    5. stats: Stats = records the duration of the "render" phase. Optional.
+    6. cache_dir: str = Folder of the render cache. Outputs are keyed by the DOT source and
+    output format, so `dot` isn't run again for an unchanged graph. If None, caching is disabled.
     """
-    updated_file_path = (
-        f"{TEMP_FOLDER}/{GRAPH_FOLDER_DEFAULT_NAME}"
-        if file_path is None
-        else file_path
-    )
+    package_config.ensure_dot_installed()
 
-    graph.render(updated_file_path, format=output_format, view=file_path is not None)
+    cache: RenderCache = get_render_cache(cache_dir) if cache_dir else None
+    output: bytes = None
+    if cache:
+        key = cache.get_key(
+            graph.source, output_format, package_config.get_dot_version()
+        )
+        output = cache.get(key)
+        if output is None:
+            count(stats, "render_cache_misses")
+        else:
+            count(stats, "render_cache_hits")
 
     if file_path is None:
-        # Read the svg file and return it as a string
-        with open(f"{updated_file_path}.{output_format}", "r") as f:
-            result = f.read()
-            utils.flush(f"{TEMP_FOLDER}/")
-            return result
+        if output is None:
+            with phase(stats, "render"):
+                output = graph.pipe(format=output_format)
+            if cache:
+                cache.set(key, output)
+        if output_format in TEXT_OUTPUT_FORMATS:
+            return output.decode("utf-8")
+        return output
+
+    if view is None:
+        view = True
 
+    if output is None:
+        with phase(stats, "render"):
+            output_path = graph.render(file_path, format=output_format, view=view)
+        if cache:
+            with open(output_path, "rb") as f:
+                cache.set(key, f.read())
+        return ""
+
+    # same files as `graph.render`: the DOT source and the output next to it
+    graph.save(file_path)
+    output_path = f"{file_path}.{output_format}"
+    with open(output_path, "wb") as f:
+        f.write(output)
+    if view:
+        import graphviz
+
+        graphviz.view(output_path)
     return ""
+
+
+class RenderResult(namedtuple("RenderResult", ["output", "error"])):
+    output: "str | bytes"  # rendered output, or path of the rendered file
+    error: str  # None if the graph was rendered successfully
+
+
+def _render_job(
+    graph: "graphviz.Digraph",
+    file_path: str,
+    output_format: str,
+    timeout: float,
+    cache: RenderCache = None,
+    dot_version: str = None,
+) -> RenderResult:
+    """
+    Lay out a single graph by piping its source to a `dot` process, unless its output is
+    in `cache`.
+    """
+    output: bytes = None
+    if cache:
+        key = cache.get_key(graph.source, output_format, dot_version)
+        output = cache.get(key)
+
+    if output is None:
+        try:
+            result = subprocess.run(
+                [graph.engine, f"-T{output_format}"],
+                input=graph.source.encode("utf-8"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+                check=True,
+            )
+        except subprocess.TimeoutExpired:
+            return RenderResult(None, f"Timed out after {timeout} seconds")
+        except subprocess.CalledProcessError as e:
+            return RenderResult(None, e.stderr.decode("utf-8", "replace").strip())
+        except OSError as e:
+            return RenderResult(None, str(e))
+        output = result.stdout
+        if cache:
+            cache.set(key, output)
+
+    if file_path is None:
+        if output_format in TEXT_OUTPUT_FORMATS:
+            return RenderResult(output.decode("utf-8"), None)
+        return RenderResult(output, None)
+
+    output_path = f"{file_path}.{output_format}"
+    folder = os.path.dirname(output_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(output)
+    return RenderResult(output_path, None)
+
+
+def render_batch(
+    graphs: "list[graphviz.Digraph]",
+    file_paths: "list[str]" = None,
+    output_format: str = "svg",
+    max_workers: int = None,
+    timeout: float = None,
+    cache_dir: str = None,
+) -> "list[RenderResult]":
+    """
+    Renders many graphviz objects concurrently, using a bounded pool of `dot` processes.
+    @Parameters:
+    1. graphs: list[graphviz.Digraph] = Graphviz objects to render.
+    2. file_paths: list[str] = file path (without extension) to save each output to. If None,
+    the outputs are returned in memory: str for text formats (e.g. svg), bytes otherwise.
+    3. output_format: str = Output format. Defaults to svg. Other formats include "png", "pdf".
+    4. max_workers: int = Maximum number of concurrent `dot` processes. Defaults to the number of cores.
+    5. timeout: float = Seconds after which a single layout is killed. Defaults to no timeout.
+    6. cache_dir: str = Folder of the render cache, see `render`. If None, caching is disabled.
+    @Returns: one RenderResult per graph, in the same order as `graphs`.
+    """
+    package_config.ensure_dot_installed()
+    cache = get_render_cache(cache_dir) if cache_dir else None
+    dot_version = package_config.get_dot_version()
+
+    if file_paths is None:
+        file_paths = [None] * len(graphs)
+    if len(file_paths) != len(graphs):
+        raise ValueError("Expected one file path per graph.")
+
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                lambda job: _render_job(
+                    job[0], job[1], output_format, timeout, cache, dot_version
+                ),
+                zip(graphs, file_paths),
+            )
+        )
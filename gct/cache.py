@@ -0,0 +1,147 @@
+"""
+Content-addressed on-disk cache of extraction results.
+Entries are keyed by a hash of the source code and the GCT version, so a file that
+hasn't changed since the last run costs little more than hashing it. The cache is
+size-bounded; least recently used entries are evicted first.
+
+Rendered outputs are cached the same way in the `render` subfolder, keyed by the DOT
+source of the graph, so an unchanged graph is never laid out twice.
+"""
+import hashlib
+import os
+import pickle
+import threading
+
+from gct import __version__
+from gct.network import FileExtraction
+from gct.constants import CACHE_MAX_SIZE_BYTES
+from gct.stats import logger
+
+CACHE_FILE_EXTENSION = ".pickle"
+# Bump when the layout of cached `FileExtraction` objects changes.
+CACHE_FORMAT_VERSION = "2"
+RENDER_CACHE_FOLDER = "render"
+
+
+class ExtractionCache:
+    """
+    Stores `FileExtraction` objects as pickle files inside `cache_dir`.
+    Reading an entry refreshes its modification time, which is used to pick the
+    least recently used entries when the cache grows beyond `max_size`.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = CACHE_MAX_SIZE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._size: int = None  # computed lazily, on first write
+        self._lock = threading.Lock()  # guards `_size` and eviction
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(code: "str | bytes") -> str:
+        """
+        Hash of the GCT version, the cache format and the source code. `code` can also be
+        the raw bytes of a file, e.g. `SourceBuffer.source`.
+        """
+        digest = hashlib.sha256(f"{__version__}:{CACHE_FORMAT_VERSION}".encode())
+        if isinstance(code, str):
+            code = code.encode("utf-8", "surrogateescape")
+        digest.update(code)
+        return digest.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_FILE_EXTENSION}")
+
+    def get(self, key: str) -> FileExtraction:
+        """Get the cached extraction for `key`. None if not cached."""
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as f:
+                extraction = pickle.load(f)
+            os.utime(path)  # mark as recently used
+            return extraction
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # corrupt or incompatible entry
+            logger.warning("Ignoring cache entry %s. Reason: %s", path, e)
+            return None
+
+    def set(self, key: str, extraction: FileExtraction):
+        """Store `extraction` under `key` and evict old entries if the cache is full."""
+        path = self._get_path(key)
+        try:
+            replaced_size = os.path.getsize(path)  # entry overwritten by this one
+        except FileNotFoundError:
+            replaced_size = 0
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(extraction, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)  # atomic, safe with concurrent writers
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, _, size in self._get_entries())
+            else:
+                self._size += os.path.getsize(path) - replaced_size
+
+            if self._size > self.max_size:
+                self.evict()
+
+    def _get_entries(self) -> "list[tuple[float, str, int]]":
+        """(last used time, path, size) of every entry in the cache."""
+        entries = []
+        for file in os.listdir(self.cache_dir):
+            if not file.endswith(CACHE_FILE_EXTENSION):
+                continue
+            path = os.path.join(self.cache_dir, file)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in half of `max_size`."""
+        entries = sorted(self._get_entries())
+        self._size = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self._size <= self.max_size // 2:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+class RenderCache(ExtractionCache):
+    """Stores the output of `dot` (bytes) for a DOT source and output format."""
+
+    @staticmethod
+    def get_key(source: str, output_format: str, dot_version: str) -> str:
+        """Hash of the `dot` version, the output format and the DOT source."""
+        digest = hashlib.sha256(f"{dot_version}:{output_format}:".encode())
+        digest.update(source.encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+
+_caches: "dict[str, ExtractionCache]" = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(cache_dir: str) -> ExtractionCache:
+    """Get the cache of `cache_dir`, shared by every thread of the current process."""
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = ExtractionCache(cache_dir)
+        return _caches[cache_dir]
+
+
+def get_render_cache(cache_dir: str) -> RenderCache:
+    """Get the render cache of `cache_dir`, shared by every thread of the current process."""
+    path = os.path.join(cache_dir, RENDER_CACHE_FOLDER)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = RenderCache(path)
+        return _caches[path]
@@ -4,3 +4,11 @@ NODE_NAMES_TO_IGNORE = {"super"}
 SELF_NODE_NAME = "self"
 TEMP_FOLDER = "temp"
 GRAPH_FOLDER_DEFAULT_NAME = "gct_graph"
+CACHE_MAX_SIZE_BYTES = 256 * 1024 * 1024
+# Level of detail: graphs above these sizes are reduced before layout
+LOD_MAX_NODES = 300
+LOD_MAX_EDGES = 1000
+# server, see gct.server
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_QUEUE_SIZE = 64  # requests waiting for a worker
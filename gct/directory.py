@@ -0,0 +1,175 @@
+"""
+Package-level tracing. Every python file of a directory is parsed and extracted
+in parallel (one process per core), then the per-file graphs are merged into a
+single graph where every module is a cluster.
+Calls are still resolved at file-level, i.e. calls across modules aren't traced.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import gct.utils as utils
+import gct.constants as constants
+from gct.parse import extract
+from gct.network import Node, Graph, FileExtraction
+from gct.cache import ExtractionCache, get_cache
+from gct.source import SourceBuffer
+from gct.stats import logger
+
+IGNORED_FOLDERS = {"__pycache__", "venv", "env", "node_modules", "build", "dist"}
+
+
+def find_python_files(path: str) -> "list[str]":
+    """
+    Recursively find all python files in `path`, skipping hidden and build folders.
+    @Parameters:
+    1. path: str = path to the folder to search in.
+    @Returns: sorted list of python file paths.
+    """
+    python_files = []
+    for folder, subfolders, files in os.walk(path):
+        subfolders[:] = [
+            subfolder
+            for subfolder in subfolders
+            if not subfolder.startswith(".") and subfolder not in IGNORED_FOLDERS
+        ]
+        for file in files:
+            if file.endswith(".py"):
+                python_files.append(os.path.join(folder, file))
+    return sorted(python_files)
+
+
+def extract_file(path: str, cache_dir: str = None) -> FileExtraction:
+    """
+    Parse and extract a single file. Runs in a worker process.
+    @Parameters:
+    1. path: str = path to the python file.
+    2. cache_dir: str = folder of the extraction cache. If None, caching is disabled.
+    @Returns: FileExtraction of the file.
+    """
+    try:
+        source = utils.read_source_buffer(path)
+    except (UnicodeDecodeError, ValueError) as e:
+        return FileExtraction(path, [], [], [], str(e))
+    with source:
+        return extract_code(path, source, cache_dir)
+
+
+def extract_code(
+    path: str, code: "str | SourceBuffer", cache_dir: str = None
+) -> FileExtraction:
+    """
+    Parse and extract the source code of a single file. Runs in a worker process.
+    @Parameters:
+    1. path: str = path (or URL) of the file, used in error messages and as module name.
+    2. code: str | SourceBuffer = source code of the file.
+    3. cache_dir: str = folder of the extraction cache. If None, caching is disabled.
+    @Returns: FileExtraction of the file.
+    """
+    cache: ExtractionCache = get_cache(cache_dir) if cache_dir else None
+    try:
+        source = code if isinstance(code, SourceBuffer) else SourceBuffer(code)
+        if cache:
+            key = cache.get_key(source.source)
+            extraction = cache.get(key)
+            if extraction is not None:
+                return extraction._replace(path=path)
+
+        tree, raw_code = utils.parse_source(source, filename=path)
+        node_representation, edge_representation = extract(tree, raw_code)
+    except (SyntaxError, ValueError) as e:
+        return FileExtraction(path, [], [], [], str(e))
+
+    extraction = FileExtraction.from_graphs(
+        path, node_representation, edge_representation
+    )
+    if cache:
+        cache.set(key, extraction)
+    return extraction
+
+
+def get_module_name(root_path: str, path: str) -> str:
+    """E.g.: `pkg/sub/mod.py` relative to `pkg` --> `sub.mod`"""
+    relative_path = os.path.relpath(path, root_path)
+    return os.path.splitext(relative_path)[0].replace(os.sep, ".")
+
+
+def merge(
+    root_path: str, extractions: "list[FileExtraction]"
+) -> "tuple[Graph, Graph]":
+    """
+    Merge per-file extractions into a single package-level graph. The root node of
+    every file is replaced by a module node, which is a child of the package node.
+    @Parameters:
+    1. root_path: str = path to the package.
+    2. extractions: list[FileExtraction] = per-file extraction results.
+    @Returns: node (containment) graph and edge (call) graph of the package.
+    """
+    node_representation = Graph()
+    edge_representation = Graph()
+    package_name = os.path.basename(os.path.normpath(root_path))
+    package_node = Node(
+        constants.ROOT_NODE_LINENO, 0, package_name, "module", f"package/{package_name}"
+    )
+
+    for extraction in extractions:
+        if extraction.error is not None:
+            logger.warning("Skipping %s: %s", extraction.path, extraction.error)
+            continue
+        if not extraction.nodes:
+            continue
+
+        module_name = get_module_name(root_path, extraction.path)
+        module_node = Node(
+            constants.ROOT_NODE_LINENO,
+            extraction.nodes[0][1],
+            module_name,
+            "module",
+            f"module/{module_name}",
+        )
+        node_representation.add_edge(package_node, module_node)
+        extraction.to_graphs(
+            module_node,
+            node_representation,
+            edge_representation,
+            id_prefix=f"{module_name}/",
+        )
+
+    return node_representation, edge_representation
+
+
+def extract_files(
+    path: str, max_workers: int = None, cache_dir: str = None
+) -> "list[FileExtraction]":
+    """
+    Extract every python file in `path` in parallel.
+    @Parameters:
+    1. path: str = path to the package.
+    2. max_workers: int = number of worker processes. Defaults to the number of cores.
+    3. cache_dir: str = folder of the extraction cache. If None, caching is disabled.
+    @Returns: FileExtraction of every file, sorted by path.
+    """
+    python_files = find_python_files(path)
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(python_files) // (workers * 4))
+    extract_fn = partial(extract_file, cache_dir=cache_dir)
+
+    if workers == 1 or len(python_files) <= 1:
+        return [extract_fn(python_file) for python_file in python_files]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(extract_fn, python_files, chunksize=chunksize))
+
+
+def extract_directory(
+    path: str, max_workers: int = None, cache_dir: str = None
+) -> "tuple[Graph, Graph]":
+    """
+    Extract every python file in `path` in parallel and merge the results.
+    @Parameters:
+    1. path: str = path to the package.
+    2. max_workers: int = number of worker processes. Defaults to the number of cores.
+    3. cache_dir: str = folder of the extraction cache. If None, caching is disabled.
+    @Returns: node (containment) graph and edge (call) graph of the package.
+    """
+    return merge(path, extract_files(path, max_workers, cache_dir))
@@ -0,0 +1,172 @@
+"""
+Graphviz-free export of the extracted graphs. The node (containment) graph is written
+as nested clusters and the edge (call) graph as a list of edges, streamed straight to
+a text stream. Neither the graphviz package nor the `dot` executable is required,
+and no `graphviz.Digraph` is built.
+"""
+import io
+import json
+
+from gct.network import Node, Graph
+from gct.utils import generate_color
+
+EXPORT_FORMATS = ("json", "dot")
+
+
+def _quote(text: str) -> str:
+    return json.dumps(text)  # a JSON string is a valid DOT quoted string
+
+
+def _write_dot_attributes(stream: io.TextIOBase, attributes: "dict[str, str]"):
+    stream.write(
+        " ".join(
+            f"{key}={value if value.startswith('<') else _quote(value)}"
+            for key, value in attributes.items()
+        )
+    )
+
+
+def _write_dot_nodes(
+    stream: io.TextIOBase,
+    node_representation: Graph,
+    root: Node,
+    visited: "set[Node]",
+    depth: int,
+):
+    """Same layout as `utils.add_subgraphs`: parents become clusters, leaves become nodes."""
+    indent = "\t" * depth
+    for node in node_representation.get_children_nodes(root):
+        if node in visited:
+            continue
+        visited.add(node)
+        text = node.__repr__()
+
+        if not node_representation.is_leaf_node(node):  # create subgraph
+            bgcolor = "transparent"
+            if node.type == "class":
+                text = f"< <B>{text}</B> >"
+                bgcolor = generate_color(node)
+
+            stream.write(f"{indent}subgraph {_quote(node.id)} {{\n")
+            stream.write(f"{indent}\t{_quote(node.id)} [fontsize=0 style=invis]\n")
+            stream.write(f"{indent}\t")
+            _write_dot_attributes(
+                stream,
+                {
+                    "bgcolor": bgcolor,
+                    "cluster": "true",
+                    "color": "black",
+                    "label": text,
+                    "style": "rounded",
+                },
+            )
+            stream.write("\n")
+            _write_dot_nodes(stream, node_representation, node, visited, depth + 1)
+            stream.write(f"{indent}}}\n")
+        else:
+            attributes = {
+                "label": text,
+                "fillcolor": "transparent",
+                "shape": "",
+                "style": "rounded",
+            }
+            if node.type == "class":
+                attributes.update(
+                    label=f"< <B>{text}</B> >",
+                    fillcolor=generate_color(node),
+                    shape="box",
+                    style="rounded, filled",
+                )
+            stream.write(f"{indent}{_quote(node.id)} [")
+            _write_dot_attributes(stream, attributes)
+            stream.write("]\n")
+
+
+def write_dot(
+    node_representation: Graph, edge_representation: Graph, stream: io.TextIOBase
+):
+    """
+    Stream the graphs to `stream` in graphviz DOT format.
+    The output is equivalent to the source of the graphviz object built by `api.to_graphviz`.
+    """
+    stream.write("digraph G {\n")
+    stream.write("\tcompound=true rankdir=LR ranksep=1.0\n")
+    root = node_representation.get_root_node()
+    if root:
+        _write_dot_nodes(stream, node_representation, root, set(), 1)
+    for u, v in edge_representation.get_edges():
+        stream.write(f"\t{_quote(u.id)} -> {_quote(v.id)}\n")
+    stream.write("}\n")
+
+
+def _write_json_node(stream: io.TextIOBase, node_representation: Graph, node: Node):
+    stream.write(
+        f'{{"id": {_quote(node.id)}, "name": {_quote(node.name)}, '
+        f'"type": {json.dumps(node.type)}, "line": {node.line_start + 1}, '
+        f'"children": ['
+    )
+    for i, child in enumerate(node_representation.get_children_nodes(node)):
+        if i:
+            stream.write(", ")
+        _write_json_node(stream, node_representation, child)
+    stream.write("]}")
+
+
+def write_json(
+    node_representation: Graph, edge_representation: Graph, stream: io.TextIOBase
+):
+    """
+    Stream the graphs to `stream` as JSON. E.g.:
+    ```
+    {
+        "nodes": [{"id": "...", "name": "A", "type": "class", "line": 1, "children": [...]}],
+        "edges": [{"source": "...", "target": "..."}]
+    }
+    ```
+    `nodes` holds the top-level functions/classes; nested ones are listed in `children`.
+    Edges reference node ids.
+    """
+    stream.write('{"nodes": [')
+    root = node_representation.get_root_node()
+    if root:
+        for i, node in enumerate(node_representation.get_children_nodes(root)):
+            if i:
+                stream.write(", ")
+            _write_json_node(stream, node_representation, node)
+
+    stream.write('], "edges": [')
+    for i, (u, v) in enumerate(edge_representation.get_edges()):
+        if i:
+            stream.write(", ")
+        stream.write(f'{{"source": {_quote(u.id)}, "target": {_quote(v.id)}}}')
+    stream.write("]}\n")
+
+
+def export(
+    node_representation: Graph,
+    edge_representation: Graph,
+    output_format: str = "json",
+    stream: io.TextIOBase = None,
+) -> str:
+    """
+    Export the graphs without graphviz.
+    @Parameters:
+    1. node_representation: Graph = node (containment) graph.
+    2. edge_representation: Graph = edge (call) graph.
+    3. output_format: str = "json" or "dot".
+    4. stream: io.TextIOBase = text stream to write to. If None, the output is returned as a str.
+    @Returns: the exported graph if `stream` is None, otherwise an empty string.
+    """
+    writers = {"json": write_json, "dot": write_dot}
+    if output_format not in writers:
+        raise ValueError(
+            f"Unsupported export format: {output_format}. Options: {EXPORT_FORMATS}"
+        )
+
+    if stream is not None:
+        writers[output_format](node_representation, edge_representation, stream)
+        return ""
+
+    buffer = io.StringIO()
+    writers[output_format](node_representation, edge_representation, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,89 @@
+"""
+Focused rendering. Instead of the whole file, only the neighborhood of a symbol is kept:
+the functions/classes that call it or are called by it (transitively, up to `depth`
+calls away), plus the clusters (classes, functions, modules) that contain them.
+Layout cost is then proportional to the region of interest, not to the file size.
+"""
+from gct.network import Node, Graph, get_qualified_name
+
+
+def find_nodes(node_representation: Graph, symbol: str) -> "list[Node]":
+    """
+    Find the nodes matching `symbol`, a qualified name (`Class.method`), a suffix of one
+    (`method`) or a node id (`Class.method#12`).
+    """
+    root = node_representation.get_root_node()
+    matches = []
+    for node in node_representation.get_all_nodes():
+        if node is root:
+            continue
+        name = node.id if "#" in symbol else get_qualified_name(node)
+        if name == symbol or name.endswith((f".{symbol}", f"/{symbol}")):
+            matches.append(node)
+    return matches
+
+
+def get_neighborhood(
+    edge_representation: Graph, nodes: "list[Node]", depth: int
+) -> "set[Node]":
+    """Nodes at most `depth` calls away from `nodes`, following calls in both directions."""
+    callers: "dict[Node, list[Node]]" = {}
+    for u, v in edge_representation.get_edges():
+        callers.setdefault(v, []).append(u)
+
+    neighborhood = set(nodes)
+    frontier = list(nodes)
+    for _ in range(depth):
+        next_frontier = []
+        for node in frontier:
+            neighbors = edge_representation.get_children_nodes(node)
+            neighbors.extend(callers.get(node, []))
+            for neighbor in neighbors:
+                if neighbor not in neighborhood:
+                    neighborhood.add(neighbor)
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return neighborhood
+
+
+def focus(
+    node_representation: Graph,
+    edge_representation: Graph,
+    symbol: str,
+    depth: int = 1,
+) -> "tuple[Graph, Graph]":
+    """
+    Induced subgraph of the k-hop callers and callees of `symbol`.
+    @Parameters:
+    1. node_representation: Graph = node (containment) graph.
+    2. edge_representation: Graph = edge (call) graph.
+    3. symbol: str = function/class to focus on, e.g. `Class.method`. See `find_nodes`.
+    4. depth: int = maximum number of calls between `symbol` and the nodes kept.
+    @Returns: node (containment) graph and edge (call) graph of the neighborhood.
+    """
+    nodes = find_nodes(node_representation, symbol)
+    if not nodes:
+        raise ValueError(f"No function/class named {symbol} found.")
+
+    neighborhood = get_neighborhood(edge_representation, nodes, depth)
+
+    # keep the clusters containing the neighborhood
+    kept = set()
+    root = node_representation.get_root_node()
+    for node in neighborhood:
+        while node is not None and node is not root and node not in kept:
+            kept.add(node)
+            node = node_representation.get_parent_node(node)
+
+    focused_node_representation = Graph()
+    for node in node_representation.get_all_nodes():  # parents before children
+        if node in kept:
+            focused_node_representation.add_edge(
+                node_representation.get_parent_node(node), node
+            )
+
+    focused_edge_representation = Graph()
+    for u, v in edge_representation.get_edges():
+        if u in neighborhood and v in neighborhood:
+            focused_edge_representation.add_edge(u, v)
+    return focused_node_representation, focused_edge_representation
@@ -0,0 +1,280 @@
+"""
+Level of detail (LOD) reduction of huge graphs, applied before layout.
+`dot` layout cost grows superlinearly with the number of nodes and edges, so graphs
+above the configured thresholds are simplified step by step, stopping as soon as they
+fit:
+1. leaf functions/methods that don't call anything are folded into their parent.
+2. classes are collapsed into a single node.
+3. nested functions are collapsed into their ancestors, one level at a time.
+4. only the most connected nodes (and edges) are kept.
+Calls between collapsed nodes are merged into weighted edges. Collapsed nodes keep their
+id and are labelled with the number of nodes folded into them, e.g. `A (+12) #3`.
+"""
+from collections import namedtuple
+
+from gct.network import Node, Graph
+from gct.constants import LOD_MAX_NODES, LOD_MAX_EDGES
+from gct.stats import logger
+
+
+class LODConfig(namedtuple("LODConfig", ["max_nodes", "max_edges"])):
+    max_nodes: int  # maximum number of nodes to lay out
+    max_edges: int  # maximum number of (merged) call edges to lay out
+
+
+DEFAULT_LOD = LODConfig(max_nodes=LOD_MAX_NODES, max_edges=LOD_MAX_EDGES)
+
+
+class LODReport(
+    namedtuple(
+        "LODReport",
+        ["nodes_before", "edges_before", "nodes_after", "edges_after", "steps"],
+    )
+):
+    nodes_before: int
+    edges_before: int
+    nodes_after: int
+    edges_after: int
+    steps: "list[str]"  # description of every reduction applied, in order
+
+    @property
+    def is_reduced(self) -> bool:
+        return bool(self.steps)
+
+    def summary(self) -> str:
+        lines = [
+            f"Reduced graph from {self.nodes_before} nodes/{self.edges_before} edges "
+            f"to {self.nodes_after} nodes/{self.edges_after} edges:"
+        ]
+        lines.extend(f"- {step}" for step in self.steps)
+        return "\n".join(lines)
+
+
+class ReducedGraph(
+    namedtuple(
+        "ReducedGraph",
+        ["node_representation", "edge_representation", "edge_weights", "report"],
+    )
+):
+    node_representation: Graph  # node (containment) graph
+    edge_representation: Graph  # edge (call) graph, parallel edges merged
+    edge_weights: "dict[tuple[Node, Node], int]"  # number of calls merged into every edge
+    report: LODReport
+
+
+class _Reduction:
+    """Union of nodes into their representative (an ancestor), i.e. the visible node."""
+
+    def __init__(self, node_representation: Graph, edge_representation: Graph):
+        self.root = node_representation.get_root_node()
+        self.nodes = node_representation.get_all_nodes()[1:]  # parents before children
+        self.parent = {
+            node: node_representation.get_parent_node(node) for node in self.nodes
+        }
+        self.calls = edge_representation.get_edges()
+        self._representative: "dict[Node, Node]" = {}
+        self.folded: "dict[Node, int]" = {}  # node -> number of nodes folded into it
+        self.hidden: "set[Node]" = set()
+
+    def find(self, node: Node) -> Node:
+        path = []
+        while node in self._representative:
+            path.append(node)
+            node = self._representative[node]
+        for visited in path:  # path compression
+            self._representative[visited] = node
+        return node
+
+    def merge(self, node: Node, into: Node) -> bool:
+        """Fold `node` into `into`. False if it already was."""
+        node, into = self.find(node), self.find(into)
+        if node is into:
+            return False
+        self._representative[node] = into
+        self.folded[into] = self.folded.get(into, 0) + 1 + self.folded.pop(node, 0)
+        return True
+
+    def get_visible_nodes(self) -> "list[Node]":
+        return [
+            node
+            for node in self.nodes
+            if node not in self._representative and node not in self.hidden
+        ]
+
+    def get_edge_weights(self) -> "dict[tuple[Node, Node], int]":
+        """Calls between visible nodes. Calls inside a collapsed node are dropped."""
+        weights: "dict[tuple[Node, Node], int]" = {}
+        for u, v in self.calls:
+            source, target = self.find(u), self.find(v)
+            if source in self.hidden or target in self.hidden:
+                continue
+            if source is target and u is not v:  # call inside a collapsed node
+                continue
+            weights[(source, target)] = weights.get((source, target), 0) + 1
+        return weights
+
+    def fits(self, config: LODConfig) -> bool:
+        return (
+            len(self.get_visible_nodes()) <= config.max_nodes
+            and len(self.get_edge_weights()) <= config.max_edges
+        )
+
+    def fold_leaves(self) -> int:
+        """Fold functions without children and outgoing calls into their (non-root) parent."""
+        visible_nodes = self.get_visible_nodes()
+        has_children = {self.parent[node] for node in visible_nodes}
+        has_calls = {u for u, v in self.get_edge_weights() if u is not v}
+        leaves = [
+            node
+            for node in visible_nodes
+            if node.type == "function"
+            and self.parent[node] is not self.root
+            and node not in has_children
+            and node not in has_calls
+        ]
+        for node in leaves:
+            self.merge(node, self.parent[node])
+        return len(leaves)
+
+    def collapse_classes(self) -> int:
+        """Collapse every outermost class with everything defined inside it."""
+        outermost_class: "dict[Node, Node]" = {}
+        classes = set()
+        for node in self.nodes:
+            parent = self.parent[node]
+            ancestor = outermost_class.get(parent)
+            if ancestor is None and parent.type == "class":
+                ancestor = parent
+            if ancestor is not None:
+                outermost_class[node] = ancestor
+                if self.merge(node, ancestor):
+                    classes.add(ancestor)
+        return len(classes)
+
+    def collapse_below(self, depth: int) -> int:
+        """Collapse every node deeper than `depth` into its ancestor at `depth`."""
+        node_depth: "dict[Node, int]" = {self.root: 0}
+        ancestor: "dict[Node, Node]" = {}
+        collapsed = set()
+        for node in self.nodes:
+            parent = self.parent[node]
+            node_depth[node] = node_depth[parent] + 1
+            if node_depth[node] == depth:
+                ancestor[node] = node
+            elif node_depth[node] > depth:
+                ancestor[node] = ancestor[parent]
+                if self.merge(node, ancestor[node]):
+                    collapsed.add(ancestor[node])
+        return len(collapsed)
+
+    def get_max_depth(self) -> int:
+        node_depth: "dict[Node, int]" = {self.root: 0}
+        for node in self.nodes:
+            node_depth[node] = node_depth[self.parent[node]] + 1
+        return max(node_depth.values())
+
+    def keep_most_connected(self, max_nodes: int) -> int:
+        """Hide every node but the `max_nodes` nodes with the most calls."""
+        degree = {node: 0 for node in self.get_visible_nodes()}
+        for (u, v), weight in self.get_edge_weights().items():
+            degree[u] += weight
+            degree[v] += weight
+        ranked = sorted(degree, key=lambda node: -degree[node])  # stable
+        hidden = ranked[max_nodes:]
+        self.hidden.update(hidden)
+        return len(hidden)
+
+
+def reduce_graph(
+    node_representation: Graph,
+    edge_representation: Graph,
+    config: LODConfig = DEFAULT_LOD,
+) -> ReducedGraph:
+    """
+    Reduce the graphs until they fit in `config.max_nodes` nodes and `config.max_edges`
+    edges. Graphs that already fit are returned unchanged (with unit edge weights).
+    @Parameters:
+    1. node_representation: Graph = node (containment) graph.
+    2. edge_representation: Graph = edge (call) graph.
+    3. config: LODConfig = node/edge thresholds.
+    @Returns: ReducedGraph with the reduced graphs, edge weights and a report of what was collapsed.
+    """
+    if node_representation.get_root_node() is None:
+        return ReducedGraph(
+            node_representation, edge_representation, {}, LODReport(0, 0, 0, 0, [])
+        )
+
+    reduction = _Reduction(node_representation, edge_representation)
+    nodes_before = len(reduction.nodes)
+    edges_before = len(reduction.calls)
+    steps = []
+
+    if not reduction.fits(config):
+        folded = reduction.fold_leaves()
+        if folded:
+            steps.append(f"folded {folded} leaf functions into their parent")
+
+    if not reduction.fits(config):
+        collapsed = reduction.collapse_classes()
+        if collapsed:
+            steps.append(f"collapsed {collapsed} classes into single nodes")
+
+    depth = reduction.get_max_depth() - 1
+    while depth >= 1 and not reduction.fits(config):
+        collapsed = reduction.collapse_below(depth)
+        if collapsed:
+            steps.append(
+                f"collapsed definitions nested below depth {depth} "
+                f"into {collapsed} nodes"
+            )
+        depth -= 1
+
+    if not reduction.fits(config):
+        hidden = reduction.keep_most_connected(config.max_nodes)
+        if hidden:
+            steps.append(f"hid {hidden} least connected nodes")
+
+    edge_weights = reduction.get_edge_weights()
+    if len(edge_weights) > config.max_edges:
+        ranked = sorted(edge_weights, key=lambda edge: -edge_weights[edge])  # stable
+        for edge in ranked[config.max_edges :]:
+            del edge_weights[edge]
+        steps.append(f"hid {len(ranked) - config.max_edges} least called edges")
+
+    # Build the reduced graphs. Collapsed nodes are copied to label them.
+    visible_nodes = reduction.get_visible_nodes()
+    reduced = {reduction.root: reduction.root}
+    for node in visible_nodes:
+        folded = reduction.folded.get(node)
+        reduced[node] = node
+        if folded:
+            reduced[node] = Node(
+                node.line_start,
+                node.line_end,
+                f"{node.name} (+{folded})",
+                node.type,
+                node.id,
+            )
+
+    reduced_node_representation = Graph()
+    for node in visible_nodes:
+        reduced_node_representation.add_edge(
+            reduced[reduction.find(reduction.parent[node])], reduced[node]
+        )
+    reduced_edge_representation = Graph()
+    reduced_edge_weights = {}
+    for (u, v), weight in edge_weights.items():
+        reduced_edge_representation.add_edge(reduced[u], reduced[v])
+        reduced_edge_weights[(reduced[u], reduced[v])] = weight
+
+    report = LODReport(
+        nodes_before, edges_before, len(visible_nodes), len(edge_weights), steps
+    )
+    if report.is_reduced:
+        logger.info(report.summary())
+    return ReducedGraph(
+        reduced_node_representation,
+        reduced_edge_representation,
+        reduced_edge_weights,
+        report,
+    )
@@ -1,44 +1,130 @@
-import networkx as nx
-import uuid
+import warnings
+from collections import namedtuple
 
 
 class Node:
+    """
+    A user defined function/class. Nodes are compact (`__slots__`, no per-instance `__dict__`)
+    and their ids are deterministic, so the same file always produces the same graph.
+    The default id is derived from the name and line number, which are unique within a file.
+    `ScopeTrackingVisitor` passes the fully qualified name instead, e.g. `Class.method#12`.
+    Ids are used as graphviz node names.
+    """
+
+    __slots__ = ("line_start", "line_end", "name", "type", "id")
+
     def __init__(
         self,
         line_start: int,
         line_end: int,
         name: str,
         type: str = None,
+        id: str = None,
     ):
         self.line_start = line_start
         self.line_end = line_end
         self.name = name
-        self.type = type  # options: [function, class]
-        self.id = uuid.uuid1().hex
+        self.type = type  # options: [function, class, module]
+        self.id = f"{name}#{line_start + 1}" if id is None else id
 
     def __repr__(self) -> str:
+        if self.type == "module":
+            return self.name
         return f"{self.name} #{self.line_start + 1}"
 
 
+def get_qualified_name(node: Node) -> str:
+    """Qualified name of a node, e.g. `Class.method` (`module/Class.method` in packages)."""
+    return node.id.split("#")[0]
+
+
 class Graph:
+    """
+    Directed graph of `Node`s, used both as a tree (containment) and for call edges.
+    Array-backed: every node gets an integer index on insertion, with O(1) access to its
+    parent (first predecessor) and children (successors). Nodes and edges keep their
+    insertion order. Use `to_networkx` to run networkx algorithms on the graph.
+    """
+
     def __init__(self):
-        self.G = nx.DiGraph()
         self._level_clustering = {}
+        self._nodes: "list[Node]" = []
+        self._node_index: "dict[Node, int]" = {}
+        self._parents: "list[Node]" = []  # first predecessor of every node
+        self._children: "list[list[Node]]" = []  # successors of every node
+        self._edges: "set[tuple[Node, Node]]" = set()
+        # name -> nodes with that name, in insertion order
+        self._name_index: "dict[str, list[Node]]" = {}
+        # (parent node, child name) -> children of parent node with that name
+        self._child_name_index: "dict[tuple[Node, str], list[Node]]" = {}
+        self._networkx = None  # view returned by the deprecated `G`
 
     @property
     def level_clustering(self):
         return self._level_clustering
 
+    @property
+    def G(self):
+        """
+        Deprecated networkx view of the graph, use `to_networkx` instead. The view is built
+        once and returned on every access until an edge is added to the graph. Changes made
+        to the view aren't reflected in the graph. Requires the optional networkx package.
+        """
+        warnings.warn(
+            "Graph.G is deprecated, use Graph.to_networkx() instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if self._networkx is None:
+            self._networkx = self.to_networkx()
+        return self._networkx
+
+    def _add_node(self, node: Node) -> int:
+        index = self._node_index.get(node)
+        if index is None:
+            index = len(self._nodes)
+            self._node_index[node] = index
+            self._nodes.append(node)
+            self._parents.append(None)
+            self._children.append([])
+            self._name_index.setdefault(node.name, []).append(node)
+        return index
+
     def add_edge(self, node1: Node, node2: Node):
-        self.G.add_edge(node1, node2)
+        if (node1, node2) in self._edges:
+            return
+        self._edges.add((node1, node2))
+        self._networkx = None
+        index1 = self._add_node(node1)
+        index2 = self._add_node(node2)
+        self._children[index1].append(node2)
+        if self._parents[index2] is None:
+            self._parents[index2] = node1
+        self._child_name_index.setdefault((node1, node2.name), []).append(node2)
+
+    def get_nodes_by_name(self, name: str) -> "list[Node]":
+        """Get all nodes with the given name in constant time."""
+        return list(self._name_index.get(name, []))
+
+    def get_children_nodes_by_name(self, node: Node, name: str) -> "list[Node]":
+        """Get all children of `node` with the given name in constant time."""
+        return list(self._child_name_index.get((node, name), []))
 
     def get_all_nodes(self) -> "list[Node]":
-        return list(self.G.nodes)
+        return list(self._nodes)
+
+    def get_edges(self) -> "list[tuple[Node, Node]]":
+        """All edges, grouped by source node in insertion order."""
+        return [
+            (node, child)
+            for node, children in zip(self._nodes, self._children)
+            for child in children
+        ]
 
     def get_root_node(self) -> Node:
-        if not self.get_all_nodes():
+        if not self._nodes:
             return None
-        return self.get_all_nodes()[0]
+        return self._nodes[0]
 
     def get_parent_node(self, node: Node) -> Node:
         """
@@ -48,26 +134,37 @@ class Graph:
         :type node: Node
         :return: The parent node of the node passed in.
         """
-        try:
-            return list(self.G.predecessors(node))[0]
-        except:
-            return None  # root node
+        index = self._node_index.get(node)
+        if index is None:
+            return None
+        return self._parents[index]  # None for the root node
 
     def get_children_nodes(self, node: Node) -> "list[Node]":
-        return list(self.G.successors(node))
+        index = self._node_index.get(node)
+        if index is None:
+            return []
+        return list(self._children[index])
 
     def group_nodes_by_level(self):
         if self._level_clustering:
             return
 
-        for node in self.get_all_nodes():
-            parent_node = self.get_parent_node(node)
-            if parent_node is None:
-                continue
-            self._level_clustering[parent_node] = self.get_children_nodes(parent_node)
+        for parent_node, children_nodes in zip(self._nodes, self._children):
+            if children_nodes:
+                self._level_clustering[parent_node] = list(children_nodes)
+
+    def to_networkx(self):
+        """Convert to a `networkx.DiGraph`. Requires the optional networkx package."""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._nodes)
+        graph.add_edges_from(self.get_edges())
+        return graph
 
     def is_leaf_node(self, node: Node) -> bool:
-        return len(self.get_children_nodes(node)) == 0
+        index = self._node_index.get(node)
+        return index is None or not self._children[index]
 
     def print_graph_by_levels(self):
         """
@@ -114,3 +211,75 @@ class Graph:
             print(f"--- {parent_node} ---")
             for child_node in children_nodes:
                 print(f"\t{child_node}")
+
+
+class FileExtraction(
+    namedtuple(
+        "FileExtraction", ["path", "nodes", "containment_edges", "call_edges", "error"]
+    )
+):
+    """
+    Compact, picklable form of the node and edge graphs of a single file.
+    Nodes are stored as (line_start, line_end, name, type, id) tuples and edges as pairs
+    of indices into `nodes`. Index 0 is the root node of the file.
+    """
+
+    path: str
+    nodes: "list[tuple[int, int, str, str, str]]"
+    containment_edges: "list[tuple[int, int]]"
+    call_edges: "list[tuple[int, int]]"
+    error: str  # None if the file was extracted successfully
+
+    @classmethod
+    def from_graphs(
+        cls, path: str, node_representation: Graph, edge_representation: Graph
+    ) -> "FileExtraction":
+        node_index: "dict[Node, int]" = {}
+        nodes: "list[tuple[int, int, str, str, str]]" = []
+        for node in node_representation.get_all_nodes():
+            node_index[node] = len(nodes)
+            nodes.append(
+                (node.line_start, node.line_end, node.name, node.type, node.id)
+            )
+
+        containment_edges = [
+            (node_index[u], node_index[v]) for u, v in node_representation.get_edges()
+        ]
+        call_edges = [
+            (node_index[u], node_index[v]) for u, v in edge_representation.get_edges()
+        ]
+        return cls(path, nodes, containment_edges, call_edges, None)
+
+    def to_graphs(
+        self,
+        root: Node = None,
+        node_representation: Graph = None,
+        edge_representation: Graph = None,
+        id_prefix: str = None,
+    ) -> "tuple[Graph, Graph]":
+        """
+        Rebuild the node and edge graphs.
+        @Parameters:
+        1. root: Node = node to use instead of the root node of the file.
+        2. node_representation: Graph = graph to add the nodes to. Defaults to a new graph.
+        3. edge_representation: Graph = graph to add the edges to. Defaults to a new graph.
+        4. id_prefix: str = prefix added to every node id, to keep ids unique across files.
+        @Returns: node (containment) graph and edge (call) graph.
+        """
+        node_representation = node_representation or Graph()
+        edge_representation = edge_representation or Graph()
+        if not self.nodes:
+            return node_representation, edge_representation
+
+        nodes = [Node(*node) for node in self.nodes]
+        if id_prefix is not None:
+            for node in nodes:
+                node.id = f"{id_prefix}{node.id}"
+        if root is not None:
+            nodes[0] = root
+
+        for u, v in self.containment_edges:
+            node_representation.add_edge(nodes[u], nodes[v])
+        for u, v in self.call_edges:
+            edge_representation.add_edge(nodes[u], nodes[v])
+        return node_representation, edge_representation
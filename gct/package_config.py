@@ -1,8 +1,18 @@
+import json
+import os
 import platform
+import shutil
 import subprocess
 
+from gct.stats import logger
+
 GRAPHVIZ_INSTRUCTIONS_LINK = "https://github.com/QasimWani/gct/blob/main/README.md#step-2-skip-if-already-installed-install-graphviz-executable"
 GCT_ISSUE_LINK = "https://github.com/QasimWani/gct/issues/new"
+# Set to a file path to persist the dot probe across processes.
+DOT_PROBE_CACHE_ENV = "GCT_DOT_PROBE_CACHE"
+
+# Result of the dot probe for the current process. Empty if not probed yet.
+_dot_version: "dict[str, str]" = {}
 
 
 def _install_pip_package(package: str):
@@ -12,14 +22,60 @@ def _install_pip_package(package: str):
         subprocess.check_call(["pip", "install", package])
 
 
+def _read_dot_probe_cache(cache_file: str, stamp: str) -> str:
+    try:
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+        return cache.get(stamp)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_dot_probe_cache(cache_file: str, stamp: str, version: str):
+    try:
+        with open(cache_file, "w") as f:
+            json.dump({stamp: version}, f)
+    except OSError as e:
+        logger.warning("Failed to cache dot probe in %s. Reason: %s", cache_file, e)
+
+
+def get_dot_version() -> str:
+    """
+    Probe the graphviz `dot` executable by running `dot -V`.
+    The probe runs at most once per process. If the `GCT_DOT_PROBE_CACHE` environment
+    variable is set, the result is also cached in that file, keyed by the path and
+    modification time of the `dot` executable.
+    @Returns: version string printed by `dot -V`. None if dot isn't installed.
+    """
+    if "dot" in _dot_version:
+        return _dot_version["dot"]
+
+    version = None
+    dot_path = shutil.which("dot")
+    if dot_path is not None:
+        stamp = f"{dot_path}:{os.stat(dot_path).st_mtime_ns}"
+        cache_file = os.environ.get(DOT_PROBE_CACHE_ENV)
+        if cache_file:
+            version = _read_dot_probe_cache(cache_file, stamp)
+
+        if version is None:
+            try:
+                result = subprocess.run(
+                    [dot_path, "-V"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                version = (result.stderr or result.stdout).decode().strip()
+            except Exception as e:
+                logger.info("Graphviz not installed. See instructions: %s", e)
+            if cache_file and version is not None:
+                _write_dot_probe_cache(cache_file, stamp, version)
+
+    _dot_version["dot"] = version
+    return version
+
+
 def _is_graphviz_installed():
     """Function that checks if graphviz is installed"""
-    try:
-        subprocess.Popen(["dot", "-V"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return True
-    except Exception as e:
-        print("Graphviz not installed. See instructions for graphviz:", e)
-    return False
+    return get_dot_version() is not None
 
 
 def _is_dot_installed():
@@ -38,9 +94,15 @@ def _is_dot_installed():
     raise Exception(message)
 
 
+def ensure_dot_installed():
+    """Raise if graphviz `dot` isn't installed. Only probes once per process."""
+    _is_dot_installed()
+
+
 # Install python packages and graphviz dist. if they don't exist.
+# Not called on import; rendering only requires `ensure_dot_installed`.
 def installer():
-    PACKAGES = ["argparse", "graphviz", "networkx", "platform", "requests"]
+    PACKAGES = ["argparse", "graphviz", "platform", "requests"]
     for package in PACKAGES:
         _install_pip_package(package)
 
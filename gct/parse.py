@@ -1,76 +1,124 @@
 import ast
 import gct.utils as utils
-from gct.syntax_tree import FunctionCallVisitor, UserDefinedFuncVisitor
+from gct.syntax_tree import ScopeTrackingVisitor
 from gct.network import Node, Graph
 import gct.constants as constants
-from gct.type_check import Metadata
+from gct.type_check import Metadata, ResolutionCache
+from gct.scope import ScopeIndex
+from gct.source import SourceBuffer
+from gct.stats import Stats, count, phase
 
 
-def extract(tree: ast, raw_code: "list[str]"):
-    """2 pass algorithm"""
+def traverse(tree: ast, raw_code: SourceBuffer) -> ScopeTrackingVisitor:
+    """
+    Node creation. Traverse the AST once, creating nodes, containment edges, call sites
+    and the symbol table of the file.
+    """
+    visitor = ScopeTrackingVisitor(
+        Node(constants.ROOT_NODE_LINENO, len(raw_code), "root")
+    )
+    visitor.visit(tree)
+    return visitor
 
-    node_line_map: "dict[int, Node]" = {
-        constants.ROOT_NODE: Node(constants.ROOT_NODE_LINENO, len(raw_code), "root")
-    }
+
+def connect_nodes(visitor: ScopeTrackingVisitor) -> Graph:
+    """Node connection. Build the node (containment) graph from the traversal."""
     node_creation_graph = Graph()
+    for parent_node, node in visitor.containment_edges:
+        node_creation_graph.add_edge(parent_node, node)
+    return node_creation_graph
+
+
+def resolve_calls(
+    tree: ast,
+    raw_code: SourceBuffer,
+    visitor: ScopeTrackingVisitor,
+    node_creation_graph: Graph,
+    resolution_cache: ResolutionCache = None,
+    stats: Stats = None,
+) -> Graph:
+    """
+    Edge connection. Resolve every call site to its potential target nodes.
+    Calls made at module level aren't resolved and are counted as neither resolved
+    nor unresolved.
+    """
+    if resolution_cache is None:
+        resolution_cache = ResolutionCache()
+
+    node_line_map: "dict[int, Node]" = visitor.node_line_map
     edge_creation_graph = Graph()
+    scope_index = ScopeIndex.from_nodes(
+        node_line_map.values(), raw_code, visitor.identifiers
+    )
+
+    for call_name, line_start_source_function in visitor.call_sites:
+        # 1. immediate parent (i.e. scope of where this function was called) is tracked by the visitor
+        # 2. find what function is being called (i.e. scope of where this function was defined)
+        # 3. connect (1) to (2) via `Edge`
 
-    # Node creation
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-            func_visitor = UserDefinedFuncVisitor()
-            func_visitor.visit(node)
-            node_line_map[func_visitor.node.line_start] = func_visitor.node
-
-    # Node connection
-    for start_lineno, node in node_line_map.items():
-        node: Node = node
-        if (
-            start_lineno == constants.ROOT_NODE_LINENO
-        ):  # root node has no parent. skip connection
+        # ignore all root connections for now
+        if line_start_source_function == constants.ROOT_NODE_LINENO:
             continue
-        parent_lineno: int = utils.get_immediate_parent(raw_code, start_lineno)
-        parent_node: Node = node_line_map[parent_lineno]
 
-        node_creation_graph.add_edge(parent_node, node)
-    # Edge connection
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            call_visitor = FunctionCallVisitor()
-            call_visitor.visit(node.func)
-
-            # 1. find immediate parent (i.e. scope of where this function was called)
-            # 2. find what function is being called (i.e. scope of where this function was defined)
-            # 3. connect (1) to (2) via `Edge`
-
-            line_start_source_function = utils.get_immediate_parent(
-                raw_code, node.lineno - 1, call_visitor.name
-            )
-
-            source_node: Node = None
-
-            if line_start_source_function in node_line_map:
-                source_node = node_line_map[line_start_source_function]
-            else:
-                continue  # skip if source function is not defined in the file
-
-            potential_target_nodes = utils.find_function_of_interest(
-                call_visitor.name,
-                Metadata(
-                    tree,
-                    raw_code,
-                    node_creation_graph,
-                    node_line_map,
-                    line_start_source_function,
-                ),
-            )
-
-            # ignore all root connections for now
-            if source_node.line_start == constants.ROOT_NODE_LINENO:
-                continue
-
-            # create an edge for each potential target node with source node
-            for target_node in potential_target_nodes:
-                edge_creation_graph.add_edge(source_node, target_node)
+        source_node: Node = node_line_map[line_start_source_function]
+
+        potential_target_nodes = utils.find_function_of_interest(
+            call_name,
+            Metadata(
+                tree,
+                raw_code,
+                node_creation_graph,
+                node_line_map,
+                line_start_source_function,
+                scope_index,
+                visitor.symbol_table,
+                resolution_cache,
+            ),
+        )
+
+        count(stats, "resolved_calls" if potential_target_nodes else "unresolved_calls")
+        # create an edge for each potential target node with source node
+        for target_node in potential_target_nodes:
+            edge_creation_graph.add_edge(source_node, target_node)
+
+    return edge_creation_graph
+
+
+def extract(
+    tree: ast,
+    raw_code: SourceBuffer,
+    resolution_cache: ResolutionCache = None,
+    stats: Stats = None,
+):
+    """
+    Single pass extraction followed by call resolution.
+    1. Traverse the AST once, creating nodes, containment edges and call sites.
+    2. Resolve every call site to its potential target nodes.
+    @Parameters:
+    1. tree: ast = AST of the file.
+    2. raw_code: SourceBuffer = lines of code of the file.
+    3. resolution_cache: ResolutionCache = cache of resolved call targets. Pass an empty cache
+    to inspect its hit/miss counters afterwards. If None, a fresh cache is used.
+    4. stats: Stats = records the duration of every phase and counters. Optional.
+    @Returns: node (containment) graph and edge (call) graph.
+    """
+    if resolution_cache is None:
+        resolution_cache = ResolutionCache()
+
+    with phase(stats, "nodes"):
+        visitor = traverse(tree, raw_code)
+    with phase(stats, "connect"):
+        node_creation_graph = connect_nodes(visitor)
+    with phase(stats, "resolve"):
+        edge_creation_graph = resolve_calls(
+            tree, raw_code, visitor, node_creation_graph, resolution_cache, stats
+        )
 
+    if stats is not None:
+        stats.count("ast_nodes", sum(1 for _ in ast.walk(tree)))
+        stats.count("nodes", len(visitor.node_line_map))
+        stats.count("call_sites", len(visitor.call_sites))
+        stats.count("edges", len(edge_creation_graph.get_edges()))
+        stats.count("resolution_cache_hits", resolution_cache.hits)
+        stats.count("resolution_cache_misses", resolution_cache.misses)
     return node_creation_graph, edge_creation_graph
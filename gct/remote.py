@@ -0,0 +1,184 @@
+"""
+Batch remote input. Many files (e.g. every python file of a GitHub tree) are downloaded
+concurrently, with a bound on the number of requests in flight, overall and per host.
+Downloads are pipelined with extraction: every file is extracted in a worker process
+as soon as its body arrives, while the remaining files are still downloading.
+
+Requests go through the pooled sessions and HTTP cache of `gct.url`, on a thread pool
+driven by asyncio; no async HTTP client is required.
+"""
+import asyncio
+import json
+import os
+import posixpath
+import urllib.parse
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from gct.network import Graph, FileExtraction
+from gct.directory import extract_code, merge
+from gct.url import fetch, get_raw_url
+
+MAX_CONCURRENCY = 16  # requests in flight
+MAX_PER_HOST = 8  # requests in flight to a single host
+GITHUB_API_URL = "https://api.github.com"
+
+
+def is_github_tree_url(url: str) -> bool:
+    """E.g. https://github.com/owner/repo/tree/main/path/to/package"""
+    parsed = urllib.parse.urlparse(url)
+    parts = parsed.path.strip("/").split("/")
+    return (
+        (parsed.hostname or "").startswith("github.com")
+        and len(parts) >= 4
+        and parts[2] == "tree"
+    )
+
+
+def list_github_tree(url: str, cache_dir: str = None) -> "list[str]":
+    """
+    Raw URLs of every python file of a GitHub tree (folder) URL, using the GitHub API.
+    The ref (branch, tag or commit) can't contain `/`.
+    """
+    path = urllib.parse.urlparse(url).path
+    owner, repo, _, ref, *folder = path.strip("/").split("/")
+    prefix = "/".join(folder)
+    listing = json.loads(
+        fetch(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{ref}?recursive=1",
+            cache_dir,
+        )
+    )
+    return [
+        f"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{item['path']}"
+        for item in listing.get("tree", [])
+        if item["type"] == "blob"
+        and item["path"].endswith(".py")
+        and (not prefix or item["path"].startswith(f"{prefix}/"))
+    ]
+
+
+def _get_location(url: str) -> str:
+    """Host and path of `url`, e.g. `host/pkg/a.py` for `https://host/pkg/a.py?raw=1`."""
+    parsed = urllib.parse.urlparse(url)
+    return f"{parsed.netloc}{parsed.path}"
+
+
+def get_root_path(urls: "list[str]") -> str:
+    """
+    Longest folder shared by every URL, e.g. `host/pkg` for `https://host/pkg/a.py`
+    and `https://host/pkg/sub/b.py`. Empty if the URLs are on different hosts.
+    """
+    folders = [posixpath.dirname(_get_location(url)) for url in urls]
+    return posixpath.commonpath(folders)
+
+
+def get_relative_path(root_path: str, url: str) -> str:
+    """Path of `url` relative to `root_path`, with local separators. See `get_root_path`."""
+    relative_path = _get_location(url)[len(root_path) :].lstrip("/")
+    return os.path.join(*relative_path.split("/"))
+
+
+async def iter_extractions(
+    urls: "list[str]",
+    cache_dir: str = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_per_host: int = MAX_PER_HOST,
+    max_workers: int = None,
+):
+    """
+    Download and extract `urls`, yielding every FileExtraction as soon as it's ready,
+    i.e. in completion order. Failed downloads are yielded as extractions with an error.
+    GitHub URLs are rewritten to raw URLs, see `url.get_raw_url`.
+    @Parameters:
+    1. urls: list[str] = URLs of the python files.
+    2. cache_dir: str = folder of the HTTP and extraction caches. If None, caching is disabled.
+    3. max_concurrency: int = maximum number of requests in flight.
+    4. max_per_host: int = maximum number of requests in flight to a single host.
+    5. max_workers: int = number of extraction processes. Defaults to the number of cores.
+    If 1, files are extracted one at a time in this process, without a process pool.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    host_semaphores: "dict[str, asyncio.Semaphore]" = {}
+
+    async def download_and_extract(
+        url: str, downloader: ThreadPoolExecutor, extractor: Executor
+    ) -> FileExtraction:
+        host = urllib.parse.urlparse(url).netloc
+        if host not in host_semaphores:
+            host_semaphores[host] = asyncio.Semaphore(max_per_host)
+        # wait for a slot of the host before taking a global one, so requests queued
+        # behind a busy host don't hold global slots that other hosts could use
+        async with host_semaphores[host], semaphore:
+            try:
+                code = await loop.run_in_executor(downloader, fetch, url, cache_dir)
+            except Exception as e:
+                return FileExtraction(url, [], [], [], str(e))
+        # the download slot is free while the file is extracted
+        return await loop.run_in_executor(
+            extractor, extract_code, url, code, cache_dir
+        )
+
+    # a single worker thread keeps the event loop free while extracting in-process
+    extractor_class = ThreadPoolExecutor if max_workers == 1 else ProcessPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_concurrency) as downloader:
+        with extractor_class(max_workers=max_workers) as extractor:
+            tasks = [
+                asyncio.ensure_future(
+                    download_and_extract(get_raw_url(url), downloader, extractor)
+                )
+                for url in urls
+            ]
+            for task in asyncio.as_completed(tasks):
+                yield await task
+
+
+def extract_urls(
+    urls: "list[str]",
+    cache_dir: str = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_per_host: int = MAX_PER_HOST,
+    max_workers: int = None,
+) -> "list[FileExtraction]":
+    """
+    Download and extract `urls` concurrently. See `iter_extractions`.
+    @Returns: FileExtraction of every URL, in the order of `urls`. The path of every
+    extraction is its (raw) URL.
+    """
+
+    async def collect() -> "list[FileExtraction]":
+        return [
+            extraction
+            async for extraction in iter_extractions(
+                urls, cache_dir, max_concurrency, max_per_host, max_workers
+            )
+        ]
+
+    extractions = {
+        extraction.path: extraction for extraction in asyncio.run(collect())
+    }
+    return [extractions[get_raw_url(url)] for url in urls]
+
+
+def merge_urls(extractions: "list[FileExtraction]") -> "tuple[Graph, Graph]":
+    """
+    Merge the extractions of remote files into a single package-level graph, see
+    `directory.merge`. Modules are named after their path relative to the folder shared
+    by every URL.
+    """
+    if not extractions:
+        return Graph(), Graph()
+
+    root_path = get_root_path([extraction.path for extraction in extractions])
+    package_name = posixpath.basename(root_path) or "remote"
+    return merge(
+        package_name,
+        [
+            extraction._replace(
+                path=os.path.join(
+                    package_name, get_relative_path(root_path, extraction.path)
+                )
+            )
+            for extraction in extractions
+        ],
+    )
@@ -0,0 +1,233 @@
+import ast
+import bisect
+import tokenize
+import gct.constants as constants
+from gct.network import Node
+from gct.source import SourceBuffer
+
+
+def get_line_identifiers(lines: "Iterable[str]") -> "dict[int, set[str]]":
+    """
+    Identifiers referenced on every line, found with `tokenize` so that strings and
+    comments are skipped. Attribute chains are recorded with all their prefixes, e.g.
+    `self.a.b()` references `self`, `self.a` and `self.a.b`, on the line the chain
+    starts on. Names only match whole identifiers: `run` isn't referenced by `run_all()`.
+    @Parameters:
+    1. lines: Iterable[str] = lines of code, without line endings.
+    @Returns: line number (0-based indexing) -> identifiers. Lines without any are omitted.
+    """
+    identifiers: "dict[int, set[str]]" = {}
+    readline = (f"{line}\n" for line in lines).__next__
+    chain: "list[str]" = []
+    chain_lineno = 0
+    is_attribute = False  # previous token is a `.` following the chain
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type in (tokenize.NL, tokenize.COMMENT):
+                continue  # chains can span lines inside brackets
+            if token.type == tokenize.NAME:
+                if not is_attribute:
+                    chain = []
+                    chain_lineno = token.start[0] - 1
+                chain.append(token.string)
+                identifiers.setdefault(chain_lineno, set()).add(".".join(chain))
+                is_attribute = False
+            elif token.type == tokenize.OP and token.string == "." and chain:
+                is_attribute = not is_attribute  # `a..b` isn't a chain
+                if not is_attribute:
+                    chain = []
+            else:
+                chain = []
+                is_attribute = False
+    except (tokenize.TokenError, SyntaxError):
+        pass  # incomplete code, keep the identifiers found so far
+    return identifiers
+
+
+def get_attribute_chain(node: ast.Attribute) -> str:
+    """Dotted name of an attribute chain, e.g. `self.a.b`. None if not rooted at a name."""
+    attributes = [node.attr]
+    node = node.value
+    while isinstance(node, ast.Attribute):
+        attributes.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None  # e.g. `f().a`
+    attributes.append(node.id)
+    return ".".join(reversed(attributes))
+
+
+class ScopeIndex:
+    """
+    Line -> innermost enclosing function/class lookup table for a single file.
+    The index is built once from the extracted nodes (AST `lineno`/`end_lineno`) and
+    answers "which def/class encloses line N" in O(1), replacing the upward/forward
+    line scans based on indentation.
+
+    A line belongs to a scope if it lies strictly after the scope's header line
+    and before (or on) its last line. This mirrors the indentation based logic:
+    ```
+    class A: #0
+        def b(): #1
+            c() #2
+    ```
+    Line #2 resolves to `b`, line #1 (the definition of `b`) resolves to `A` and
+    line #0 resolves to the root node.
+    All line numbers are 0-based.
+    """
+
+    def __init__(
+        self,
+        scopes: "list[tuple[int, int]]",
+        raw_code: SourceBuffer,
+        identifiers: "dict[int, set[str]]" = None,
+    ):
+        """
+        @Parameters:
+        1. scopes: list[tuple[int, int]] = (start, end) line numbers of every function/class.
+        2. raw_code: SourceBuffer = lines of code of the file.
+        3. identifiers: dict[int, set[str]] = identifiers referenced in every scope (and at
+        ROOT_NODE_LINENO, in the module), not counting nested scopes. E.g.
+        `ScopeTrackingVisitor.identifiers`. If None, scopes are tokenized when needed.
+        """
+        self.raw_code = raw_code
+        self._identifiers = identifiers
+        # maps scope start line to the scope's end line
+        self._scope_end: "dict[int, int]" = {
+            constants.ROOT_NODE_LINENO: len(raw_code) - 1
+        }
+        self._innermost: "list[int]" = []
+        self._scope_starts: "list[int]" = []  # sorted
+        # built lazily, see `get_scope_identifiers`
+        self._scope_identifiers: "dict[int, set[str]]" = {}
+        self._build(scopes)
+
+    @classmethod
+    def from_nodes(
+        cls,
+        nodes: "list[Node]",
+        raw_code: SourceBuffer,
+        identifiers: "dict[int, set[str]]" = None,
+    ) -> "ScopeIndex":
+        """Build the index from already extracted function/class nodes."""
+        scopes = [
+            (node.line_start, node.line_end)
+            for node in nodes
+            if node.line_start != constants.ROOT_NODE_LINENO
+        ]
+        return cls(scopes, raw_code, identifiers)
+
+    def _build(self, scopes: "list[tuple[int, int]]"):
+        last_lineno = max([len(self.raw_code)] + [end + 1 for _, end in scopes])
+        self._innermost = [constants.ROOT_NODE_LINENO] * last_lineno
+        # outer scopes first so that inner scopes overwrite their lines
+        for start, end in sorted(scopes, key=lambda scope: (scope[0], -scope[1])):
+            self._scope_end[start] = end
+            self._innermost[start + 1 : end + 1] = [start] * (end - start)
+        self._scope_starts = sorted(set(start for start, _ in scopes))
+
+    def get_enclosing_scope(self, lineno: int) -> int:
+        """
+        Get the line number of the innermost function/class enclosing `lineno`.
+        @Parameters:
+        1. lineno: int = line number (0-based indexing).
+        @Returns: line number of the enclosing scope, or ROOT_NODE_LINENO.
+        """
+        if lineno < 0 or lineno >= len(self._innermost):
+            return constants.ROOT_NODE_LINENO
+        return self._innermost[lineno]
+
+    def get_parent_scope(self, scope_lineno: int) -> int:
+        """Get the line number of the scope enclosing the scope defined at `scope_lineno`."""
+        if scope_lineno == constants.ROOT_NODE_LINENO:
+            return constants.ROOT_NODE_LINENO
+        return self.get_enclosing_scope(scope_lineno)
+
+    def get_scope_lines(self, scope_lineno: int) -> "list[str]":
+        """Get the source lines of the scope defined at `scope_lineno`."""
+        if scope_lineno == constants.ROOT_NODE_LINENO:
+            return self.raw_code
+        return self.raw_code[scope_lineno : self._scope_end[scope_lineno] + 1]
+
+    def get_scope_identifiers(self, scope_lineno: int) -> "set[str]":
+        """
+        Get the identifiers referenced in the scope defined at `scope_lineno`, including
+        its nested scopes: the union of the precomputed identifiers of every scope within
+        its lines, or, without precomputed identifiers, the tokenized lines of the scope
+        (see `get_line_identifiers`). Computed once per scope.
+        """
+        identifiers = self._scope_identifiers.get(scope_lineno)
+        if identifiers is not None:
+            return identifiers
+
+        if self._identifiers is None:
+            lines = self.get_scope_lines(scope_lineno)
+            identifiers = set().union(*get_line_identifiers(lines).values())
+        else:
+            identifiers = set(self._identifiers.get(scope_lineno, ()))
+            end = self._scope_end[scope_lineno]
+            i = bisect.bisect_right(self._scope_starts, scope_lineno)
+            while i < len(self._scope_starts) and self._scope_starts[i] <= end:
+                identifiers.update(self._identifiers.get(self._scope_starts[i], ()))
+                i += 1
+        self._scope_identifiers[scope_lineno] = identifiers
+        return identifiers
+
+
+class SymbolTable:
+    """
+    Per-file table of variable assignments, keyed by variable name and the scope
+    (line number of the enclosing function/class) the assignment happens in.
+    Covers `Assign` targets, including tuple unpacking:
+    ```
+    var = A()
+    temp, var = None, A()
+    ```
+    Lookups pick the definition in the nearest enclosing scope of the caller, instead
+    of the first definition found while scanning the whole AST.
+    """
+
+    def __init__(self):
+        # variable name -> scope line number -> first assignment in that scope
+        self._definitions: "dict[str, dict[int, ast.Assign]]" = {}
+        # variable name -> first assignment in the file (depth-first order)
+        self._first_definition: "dict[str, ast.Assign]" = {}
+
+    def add_assignment(self, node: ast.Assign, scope_lineno: int):
+        for target in node.targets:
+            # case I: target is a single variable
+            if isinstance(target, ast.Name):
+                self.add_definition(target.id, node, scope_lineno)
+
+            # case II: target is a tuple
+            if isinstance(target, ast.Tuple):
+                for el in target.elts:
+                    if isinstance(el, ast.Name):
+                        self.add_definition(el.id, node, scope_lineno)
+
+    def add_definition(self, name: str, node: ast.Assign, scope_lineno: int):
+        self._definitions.setdefault(name, {}).setdefault(scope_lineno, node)
+        self._first_definition.setdefault(name, node)
+
+    def lookup(
+        self, name: str, scope_lineno: int, scope_index: ScopeIndex
+    ) -> ast.Assign:
+        """
+        Find the definition of `name` visible from the scope defined at `scope_lineno`.
+        @Parameters:
+        1. name: str = name of variable to search for.
+        2. scope_lineno: int = line number of the scope the variable is used in.
+        3. scope_index: ScopeIndex = scope index of the file, used to walk up enclosing scopes.
+        @Returns: `Assign` node of the nearest definition. If not found in any enclosing scope,
+        the first definition in the file. None if the variable is never assigned.
+        """
+        definitions = self._definitions.get(name)
+        if not definitions:
+            return None
+
+        while True:
+            if scope_lineno in definitions:
+                return definitions[scope_lineno]
+            if scope_lineno == constants.ROOT_NODE_LINENO:
+                return self._first_definition[name]
+            scope_lineno = scope_index.get_parent_scope(scope_lineno)
@@ -0,0 +1,263 @@
+"""
+Long-running GCT server. Imported modules, the extraction/HTTP caches and the graphviz
+probe stay warm between requests, so a request only pays for the analysis itself.
+Requests are handled by a fixed pool of threads; when every thread is busy and the
+queue is full, new requests are rejected with `503 Service Unavailable`.
+
+Start the server with `python -m gct serve` and request a graph:
+```
+curl -X POST localhost:8000/graph -d '{"code": "def a():\\n    b()\\n\\ndef b():\\n    pass", "format": "json"}'
+curl -X POST localhost:8000/graph -d '{"url": "https://github.com/user_name/path/to/file.py"}'
+curl "localhost:8000/graph?url=https://github.com/user_name/path/to/file.py&format=svg"
+curl localhost:8000/health
+```
+Request parameters (JSON body of a POST, or query string of a GET):
+1. code | url | path: source code, URL or path of the file to analyze. Paths are only
+accepted if the server was started with a `root` folder, and must be inside it.
+2. format: "svg" (default), "png", "pdf", "json" or "dot".
+3. focus, depth: only graph the callers/callees of a function/class, see `gct.focus`.
+4. lod: if true, reduce large graphs before layout, see `gct.lod`.
+"""
+import json
+import os
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import gct.api as api
+import gct.export as exporter
+import gct.focus as focuser
+from gct import __version__
+from gct.constants import SERVER_HOST, SERVER_PORT, SERVER_MAX_QUEUE_SIZE
+from gct.directory import extract_code
+from gct.lod import DEFAULT_LOD
+from gct.package_config import get_dot_version
+from gct.stats import Stats, phase
+from gct.url import fetch_valid_url
+
+MAX_BODY_SIZE = 16 * 1024 * 1024  # bytes
+
+CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "pdf": "application/pdf",
+    "json": "application/json",
+    "dot": "text/vnd.graphviz",
+}
+
+
+class RequestError(Exception):
+    """Invalid request. Answered with `status`."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class GCTServer(HTTPServer):
+    """
+    HTTP server dispatching requests to a bounded pool of worker threads.
+    @Parameters:
+    1. address: tuple[str, int] = (host, port) to listen on.
+    2. max_workers: int = number of worker threads. Defaults to the number of cores.
+    3. max_queue_size: int = number of requests waiting for a worker before new requests
+    are rejected.
+    4. cache_dir: str = folder of the extraction, HTTP and render caches. If None, caching is disabled.
+    5. root: str = folder that `path` requests are allowed to read from. If None, only
+    code and URLs are accepted.
+    """
+
+    def __init__(
+        self,
+        address: "tuple[str, int]",
+        max_workers: int = None,
+        max_queue_size: int = SERVER_MAX_QUEUE_SIZE,
+        cache_dir: str = None,
+        root: str = None,
+    ):
+        super().__init__(address, GCTRequestHandler)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.root = os.path.realpath(root) if root else None
+        self.dot_version = get_dot_version()  # probed once, before the first request
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # requests being handled or waiting for a worker
+        self._slots = threading.BoundedSemaphore(self.max_workers + max_queue_size)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+            )
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+class GCTRequestHandler(BaseHTTPRequestHandler):
+    server: GCTServer
+    server_version = f"GCT/{__version__}"
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path == "/health":
+            status = {"status": "ok", "version": __version__}
+            self._send_json(200, {**status, "dot": self.server.dot_version})
+        elif url.path == "/graph":
+            params = dict(urllib.parse.parse_qsl(url.query))
+            self._handle_graph(params)
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {url.path}"})
+
+    def do_POST(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path != "/graph":
+            self._send_json(404, {"error": f"Unknown endpoint: {url.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_SIZE:
+            self._send_json(413, {"error": "Request body too large"})
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+        if not isinstance(params, dict):
+            self._send_json(400, {"error": "Expected a JSON object"})
+            return
+        self._handle_graph(params)
+
+    def _handle_graph(self, params: dict):
+        stats = Stats()
+        try:
+            output, content_type = self.get_graph(params, stats)
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except (SyntaxError, ValueError) as e:  # invalid code or unknown focus
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        if isinstance(output, str):
+            output = output.encode("utf-8")
+        timings = ", ".join(
+            f"{name};dur={seconds * 1000:.1f}"
+            for name, seconds in stats.timings.items()
+        )
+        self._send(200, output, content_type, {"Server-Timing": timings})
+
+    def get_graph(self, params: dict, stats: Stats) -> "tuple[str | bytes, str]":
+        """Analyze the requested file. Returns the output and its content type."""
+        output_format = params.get("format", "svg")
+        if output_format not in CONTENT_TYPES:
+            raise RequestError(
+                f"Unsupported format: {output_format}. Options: {list(CONTENT_TYPES)}"
+            )
+
+        cache_dir = self.server.cache_dir
+        if "code" in params:
+            with phase(stats, "extract"):
+                extraction = extract_code("<code>", str(params["code"]), cache_dir)
+            if extraction.error is not None:
+                raise RequestError(extraction.error)
+            graphs = extraction.to_graphs()
+        elif "url" in params:
+            status = fetch_valid_url(str(params["url"]), cache_dir)
+            if not status["valid"]:
+                error = status["error"] or "invalid URL"
+                raise RequestError(f"Failed to fetch {params['url']}: {error}")
+            graphs = api.extract_resource(
+                status["url"], cache_dir, stats, status["body"]
+            )[:2]
+        elif "path" in params:
+            path = self._get_path(params["path"])
+            *graphs, source = api.extract_resource(path, cache_dir, stats)
+            source.close()
+        else:
+            raise RequestError("Expected one of: code, url, path")
+
+        if params.get("focus"):
+            depth = int(params.get("depth", 1))
+            graphs = focuser.focus(*graphs, str(params["focus"]), depth)
+
+        content_type = CONTENT_TYPES[output_format]
+        if output_format in exporter.EXPORT_FORMATS:
+            return exporter.export(*graphs, output_format), content_type
+
+        if self.server.dot_version is None:
+            raise RequestError("Graphviz dot isn't installed on the server", 503)
+        lod = DEFAULT_LOD if str(params.get("lod")).lower() in ("1", "true") else None
+        with phase(stats, "graphviz"):
+            graph = api.to_graphviz(*graphs, lod)
+        output = api.render(
+            graph, output_format=output_format, stats=stats, cache_dir=cache_dir
+        )
+        return output, content_type
+
+    def _get_path(self, path: str) -> str:
+        """Resolve `path`, a python file that must be inside the server's root folder."""
+        root = self.server.root
+        if root is None:
+            raise RequestError("Paths aren't accepted by this server", 403)
+        path = os.path.realpath(os.path.join(root, str(path)))
+        if os.path.commonpath([root, path]) != root:
+            raise RequestError("Path is outside of the server's root folder", 403)
+        if not path.endswith(".py") or not os.path.isfile(path):
+            raise RequestError(f"No python file at {path}", 404)
+        return path
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: dict):
+        self._send(status, json.dumps(body).encode("utf-8"), "application/json")
+
+    def log_message(self, format: str, *args):
+        pass  # keep the console quiet, requests are answered with their timings
+
+
+def serve(
+    host: str = SERVER_HOST,
+    port: int = SERVER_PORT,
+    max_workers: int = None,
+    max_queue_size: int = SERVER_MAX_QUEUE_SIZE,
+    cache_dir: str = None,
+    root: str = None,
+):
+    """Run the server until interrupted. See `GCTServer` for the parameters."""
+    server = GCTServer((host, port), max_workers, max_queue_size, cache_dir, root)
+    if server.dot_version is None:
+        print("Graphviz dot isn't installed, only json and dot formats are available")
+    print(f"GCT server listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
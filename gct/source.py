@@ -0,0 +1,99 @@
+"""
+Source code of a file, held once. Large local files are memory-mapped instead of read.
+Lines are handed out lazily through a line-offset index, so the code is never split
+into a list of per-line strings.
+"""
+import io
+import mmap
+import os
+import tokenize
+from array import array
+
+MMAP_MIN_SIZE = 1024 * 1024  # files at least this large (bytes) are memory-mapped
+
+
+class SourceBuffer:
+    """
+    Read-only sequence of the lines of a file, e.g. `buffer[3]`, `buffer[3:10]`,
+    `len(buffer)`, `for line in buffer`. Lines don't include their line ending.
+    `\\n` and `\\r\\n` end a line, like in `ast` line numbers. So does `\\r` in files without
+    any `\\n` (old Mac line endings); files mixing lone `\\r` and `\\n` aren't supported.
+    `source` holds the code itself: a str, or the (memory-mapped) bytes of a file.
+    A memory-mapped file stays open until `close` is called, e.g. at the end of
+    `with SourceBuffer.from_file(path) as buffer:`.
+    """
+
+    def __init__(self, source: "str | bytes | mmap.mmap"):
+        self.source = source
+        self._newline = "\n" if isinstance(source, str) else b"\n"
+        if source.find(self._newline) == -1:
+            carriage_return = "\r" if isinstance(source, str) else b"\r"
+            if source.find(carriage_return) != -1:
+                self._newline = carriage_return
+        self.encoding = None
+        if not isinstance(source, str):
+            # the encoding is declared in the first two lines, see PEP 263
+            end = source.find(b"\n", source.find(b"\n") + 1)
+            header = source[: end + 1] if end != -1 else source[:1024]
+            self.encoding, _ = tokenize.detect_encoding(io.BytesIO(header).readline)
+        self._offsets = self._build_offsets()
+
+    @classmethod
+    def from_file(cls, path: str, mmap_min_size: int = MMAP_MIN_SIZE) -> "SourceBuffer":
+        """Read `path` with a single read, or memory-map it if it's large."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= max(mmap_min_size, 1):
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            return cls(f.read())
+
+    def _build_offsets(self) -> array:
+        """Start offset of every line, plus the end of the source."""
+        offsets = array("q", [0])
+        source = self.source
+        position = source.find(self._newline)
+        while position != -1:
+            offsets.append(position + 1)
+            position = source.find(self._newline, position + 1)
+        if offsets[-1] != len(source):  # last line has no line ending
+            offsets.append(len(source))
+        return offsets
+
+    @property
+    def text(self) -> str:
+        """The whole source code."""
+        if isinstance(self.source, str):
+            return self.source
+        return self.source[:].decode(self.encoding)
+
+    def _get_line(self, index: int) -> str:
+        line = self.source[self._offsets[index] : self._offsets[index + 1]]
+        if not isinstance(line, str):
+            line = line.decode(self.encoding)
+        return line.rstrip("\r\n")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: "int | slice") -> "str | list[str]":
+        if isinstance(index, slice):
+            return [self._get_line(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._get_line(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get_line(i)
+
+    def close(self):
+        """Release the memory-mapped file, if any. Lines can't be read afterwards."""
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+
+    def __enter__(self) -> "SourceBuffer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
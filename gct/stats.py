@@ -0,0 +1,95 @@
+"""
+Opt-in instrumentation of a GCT run. Pass a `Stats` object to `api.run`, `api.render`,
+`api.extract_resource` etc. to collect the duration of every phase and a few counters:
+
+>>> stats = Stats()
+>>> graph, code = api.run(path, stats=stats)
+>>> api.render(graph, stats=stats)
+>>> stats.to_dict()
+{"timings": {"read": ..., "parse": ..., "nodes": ..., "connect": ..., "resolve": ...,
+"graphviz": ..., "render": ...}, "counters": {"ast_nodes": ..., "call_sites": ..., ...}}
+
+Nothing is measured or printed unless a `Stats` object is passed.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases, in the order they run
+PHASES = (
+    "read",  # reading the file/URL
+    "parse",  # building the AST
+    "nodes",  # node creation, i.e. traversing the AST
+    "connect",  # linking every node to its parent
+    "resolve",  # resolving call sites to their target nodes
+    "extract",  # whole extraction of a folder (files are extracted in parallel)
+    "graphviz",  # building the graphviz object
+    "render",  # laying out the graph with dot
+)
+
+logger = logging.getLogger("gct")
+
+
+class Stats:
+    """
+    Per-phase durations (seconds) and counters of one or more GCT runs.
+    Durations and counters accumulate, so a single object can be shared by several
+    runs, including runs from different threads.
+    @Parameters:
+    1. hooks: list[callable] = called as `hook(phase, seconds)` every time a phase ends.
+    """
+
+    def __init__(self, hooks: "list[callable]" = None):
+        self.timings: "dict[str, float]" = {}
+        self.counters: "dict[str, int]" = {}
+        self.hooks = list(hooks or [])
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the body of the `with` statement as phase `name`."""
+        start_time = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            for hook in self.hooks:
+                hook(name, elapsed)
+
+    def count(self, name: str, value: int = 1):
+        """Increment counter `name` by `value`."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+    def to_json(self, **kwargs) -> str:
+        """Serialize as JSON. `kwargs` are passed on to `json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def log(self, log: logging.Logger = None, level: int = logging.INFO):
+        """Emit the stats as a single record on `log` (defaults to the "gct" logger)."""
+        stats = self.to_dict()
+        (log or logger).log(level, "GCT stats: %s", json.dumps(stats), extra=stats)
+
+
+@contextmanager
+def phase(stats: Stats, name: str):
+    """`stats.phase(name)`, or a no-op if `stats` is None."""
+    if stats is None:
+        yield None
+        return
+    with stats.phase(name):
+        yield stats
+
+
+def count(stats: Stats, name: str, value: int = 1):
+    """`stats.count(name, value)`, or a no-op if `stats` is None."""
+    if stats is not None:
+        stats.count(name, value)
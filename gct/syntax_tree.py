@@ -1,5 +1,7 @@
 import ast
 from gct.network import Node
+from gct.scope import SymbolTable, get_attribute_chain
+import gct.constants as constants
 from collections import deque
 
 
@@ -29,25 +31,93 @@ class FunctionCallVisitor(ast.NodeVisitor):
             self.generic_visit(node)
 
 
-class UserDefinedFuncVisitor(ast.NodeVisitor):
-    """Extract all user defined functions and classes"""
+class ScopeTrackingVisitor(ast.NodeVisitor):
+    """
+    Single pass extractor. Keeps a stack of the enclosing functions/classes while
+    traversing the AST and emits, in one traversal:
+    1. a `Node` for every user defined function and class.
+    2. containment edges, i.e. (enclosing scope, function/class).
+    3. raw call sites, i.e. (call name, line number of the enclosing scope), of calls
+    of a name or an attribute chain rooted at a name.
+    4. a symbol table of variable assignments.
+    5. the identifiers referenced in every scope, not counting its nested scopes.
+    Decorators, default arguments and base classes are evaluated in the enclosing scope,
+    so they're visited before the function/class is pushed on the stack.
+    """
 
-    def __init__(self):
-        self.node: Node = None
+    def __init__(self, root: Node):
+        self.node_line_map: "dict[int, Node]" = {constants.ROOT_NODE: root}
+        self.containment_edges: "list[tuple[Node, Node]]" = []
+        self.call_sites: "list[tuple[str, int]]" = []
+        # scope line number -> names and attribute chains used in it, see `ScopeIndex`
+        self.identifiers: "dict[int, set[str]]" = {constants.ROOT_NODE_LINENO: set()}
+        self.symbol_table = SymbolTable()
+        self._scope_stack: "list[Node]" = [root]
+        self._qualified_names: "list[str]" = []
+        self._call_visitor = FunctionCallVisitor()
+
+    def visit_scope(self, node: ast.AST, type: str):
+        for field, value in ast.iter_fields(node):
+            if field == "body":
+                continue
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
 
-    def create_node(self, node: ast.AST, node_name: str, type: str):
-        end_lineno = node.lineno - 1 if "end_lineno" in dir(node) else str(None)
-        self.node = Node(node.lineno - 1, end_lineno, node_name, type)
+        self._qualified_names.append(node.name)
+        end_lineno = getattr(node, "end_lineno", None)
+        scope_node = Node(
+            node.lineno - 1,
+            node.lineno - 1 if end_lineno is None else end_lineno - 1,
+            node.name,
+            type,
+            f"{'.'.join(self._qualified_names)}#{node.lineno}",
+        )
+        self.node_line_map[scope_node.line_start] = scope_node
+        self.identifiers[scope_node.line_start] = set()
+        self.containment_edges.append((self._scope_stack[-1], scope_node))
 
-    def visit_Lambda(self, node: ast.Lambda):
-        raise NotImplementedError("Lambda functions are not supported yet")
-        self.create_node(node, "lambda", "function")
+        self._scope_stack.append(scope_node)
+        for statement in node.body:
+            self.visit(statement)
+        self._scope_stack.pop()
+        self._qualified_names.pop()
 
     def visit_FunctionDef(self, node: ast.FunctionDef):
-        self.create_node(node, node.name, "function")
+        self.visit_scope(node, "function")
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        self.create_node(node, node.name, "function")
+        self.visit_scope(node, "function")
 
     def visit_ClassDef(self, node: ast.ClassDef):
-        self.create_node(node, node.name, "class")
+        self.visit_scope(node, "class")
+
+    def visit_Call(self, node: ast.Call):
+        # only calls of a name or of an attribute chain rooted at a name are resolved,
+        # e.g. `f()` or `self.a.f()`, not calls on the result of a call like `f().g()`
+        if isinstance(node.func, ast.Name) or (
+            isinstance(node.func, ast.Attribute)
+            and get_attribute_chain(node.func) is not None
+        ):
+            del self._call_visitor.name
+            self._call_visitor.visit(node.func)
+            self.call_sites.append(
+                (self._call_visitor.name, self._scope_stack[-1].line_start)
+            )
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        self.identifiers[self._scope_stack[-1].line_start].add(node.id)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        chain = get_attribute_chain(node)
+        if chain is not None:
+            self.identifiers[self._scope_stack[-1].line_start].add(chain)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign):
+        self.symbol_table.add_assignment(node, self._scope_stack[-1].line_start)
+        self.generic_visit(node)
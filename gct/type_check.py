@@ -1,19 +1,60 @@
 import ast
 from gct.network import Node, Graph
+from gct.scope import ScopeIndex, SymbolTable
+from gct.source import SourceBuffer
 from gct.constants import NODE_NAMES_TO_IGNORE
 from collections import namedtuple
 
 
 class Metadata(
     namedtuple(
-        "Metadata", ["tree", "raw_code", "node_graph", "node_line_map", "parent_lineno"]
+        "Metadata",
+        [
+            "tree",
+            "raw_code",
+            "node_graph",
+            "node_line_map",
+            "parent_lineno",
+            "scope_index",
+            "symbol_table",
+            "resolution_cache",
+        ],
     )
 ):
     tree: ast
-    raw_code: "list[str]"
+    raw_code: SourceBuffer  # lines of code of the file
     node_graph: Graph
     node_line_map: "dict[int, Node]"
     parent_lineno: int  # Line number where function of interest is defined
+    scope_index: ScopeIndex  # Line -> enclosing function/class lookup table
+    symbol_table: SymbolTable  # Variable assignments of the file
+    resolution_cache: "ResolutionCache"  # Resolved call targets of the file
+
+
+class ResolutionCache:
+    """
+    Per-extraction cache of resolved call targets, keyed by (call name, resolved scope).
+    Repeated call sites, e.g. `self.helper()` called from every method of a class,
+    are resolved once and cost a dictionary lookup afterwards.
+    Keys contain line numbers, so a cache must not be shared between files.
+    """
+
+    def __init__(self):
+        self._targets: "dict[tuple[str, int], tuple[Node, ...]]" = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: "tuple[str, int]") -> "list[Node]":
+        """Get the cached targets for `key`. None if `key` hasn't been resolved yet."""
+        targets = self._targets.get(key)
+        if targets is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(targets)
+
+    def set(self, key: "tuple[str, int]", targets: "list[Node]"):
+        self._targets[key] = tuple(targets)
 
 
 def helper_search_definition(tree, variable_name):
@@ -78,7 +119,35 @@ def search_for_definition(tree: ast, name: str) -> list:
     if name in NODE_NAMES_TO_IGNORE:
         return []
 
-    result = helper_search_definition(tree, name)
+    return get_assigned_names(helper_search_definition(tree, name))
+
+
+def lookup_definition(name: str, metadata: Metadata) -> list:
+    """
+    Same as `search_for_definition`, but looks the variable up in the symbol table of the file,
+    picking the definition in the nearest scope enclosing the function of interest.
+    @Parameters:
+    1. name: str = name of variable to search for.
+    2. metadata: Metadata = metadata for the file.
+    @Returns: list of potential targets for the variable. If empty, no target has been found.
+    """
+    if name in NODE_NAMES_TO_IGNORE:
+        return []
+
+    result = metadata.symbol_table.lookup(
+        name, metadata.parent_lineno, metadata.scope_index
+    )
+    return get_assigned_names(result)
+
+
+def get_assigned_names(result: ast.Assign) -> list:
+    """
+    Get the names of the classes/functions whose result is assigned in `result`.
+    E.g.: `var = A()` --> ["A"]
+    @Parameters:
+    1. result: ast.Assign = definition of a variable.
+    @Returns: list of potential targets for the variable. If empty, no target has been found.
+    """
     potential_target_nodes = []
 
     if not result:
@@ -152,30 +221,26 @@ def infer_complex_mappings(prefix: str, suffix: str, metadata: Metadata):
     2. suffix: str = suffix of function name.
     3. metadata: Metadata = metadata for the file.
     """
-    tree: ast = metadata.tree
     node_graph: Graph = metadata.node_graph
-    node_line_map: "dict[int, Node]" = metadata.node_line_map
     potential_target_nodes: "list[Node]" = []
 
     # Case I: prefix is a class/method name
-    prefix_target_nodes = find_nodes_by_name(prefix, node_line_map.values())
+    prefix_target_nodes = node_graph.get_nodes_by_name(prefix)
     # get children nodes for each prefix node
     for node in prefix_target_nodes:
-        children_nodes = node_graph.get_children_nodes(node)
-        suffix_target_nodes = find_nodes_by_name(suffix, children_nodes)
+        suffix_target_nodes = node_graph.get_children_nodes_by_name(node, suffix)
         potential_target_nodes.extend(suffix_target_nodes)
 
     # Case II: prefix is a variable
     if not potential_target_nodes:
-        potential_names = search_for_definition(tree, prefix)
+        potential_names = lookup_definition(prefix, metadata)
 
         for potential_name in potential_names:
-            prefix_target_nodes = find_nodes_by_name(
-                potential_name, node_line_map.values()
-            )
+            prefix_target_nodes = node_graph.get_nodes_by_name(potential_name)
             for node in prefix_target_nodes:
-                children_nodes = node_graph.get_children_nodes(node)
-                suffix_target_nodes = find_nodes_by_name(suffix, children_nodes)
+                suffix_target_nodes = node_graph.get_children_nodes_by_name(
+                    node, suffix
+                )
                 potential_target_nodes.extend(suffix_target_nodes)
 
     return potential_target_nodes
@@ -196,7 +261,7 @@ def find_nodes_by_name(target_node_name: str, nodes: "list[Node]") -> "list[Node
     return potential_target_nodes
 
 
-def infer_direct_mappings(node_line_map: "dict[int, Node]", name: str) -> "list[Node]":
+def infer_direct_mappings(node_graph: Graph, name: str) -> "list[Node]":
     """
     Handles the case where the function of interest is a direct mapping to a node.
     E.g.:
@@ -208,8 +273,8 @@ def infer_direct_mappings(node_line_map: "dict[int, Node]", name: str) -> "list[
     In this case, `func` is a direct mapping to the `Node` object corresponding to the function definition.
 
     @Parameters:
-    1. node_line_map: dict[int, Node] = maps line number to Node object.
+    1. node_graph: Graph = node (containment) graph of the file.
     2. suffix: str = suffix of function of interest.
     @Returns: list of potential targets for the function of interest.
     """
-    return find_nodes_by_name(name, node_line_map.values())
+    return node_graph.get_nodes_by_name(name)
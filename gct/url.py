@@ -1,42 +1,146 @@
 """ Ported from gct-server """
+import hashlib
+import json
+import os
+import threading
 import urllib.request
 
+from gct.stats import logger
 
-def fetch_valid_url(url: str):
-    """Make sure valid URL. Parses github URLs to raw githubusercontent URLs."""
-    status = {"valid": False, "url": None}
-    if url is None or len(url.strip()) == 0 or not url.startswith("http"):
-        return status
+HTTP_CACHE_FOLDER = "http"  # subfolder of the cache folder holding HTTP responses
+POOL_SIZE = 16  # connections kept alive per host
 
-    # Handle github raw URL.
-    host = urllib.request.urlparse(url).hostname
-    if host.startswith("raw.githubusercontent.com"):
-        # Try to open the URL.
-        status["valid"] = try_open_url(url)
-        status["url"] = url
-        return status
+_local = threading.local()  # one pooled session per thread
+
+
+def get_session() -> "requests.Session":
+    """Session of the current thread. Connections are pooled and kept alive across requests."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests  # imported lazily to keep `import gct` fast
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+class HTTPCache:
+    """
+    On-disk cache of HTTP responses, keyed by URL. Every entry stores the body and the
+    `ETag`/`Last-Modified` validators of the response, so a cached URL is revalidated
+    with a conditional request and only downloaded again if it changed.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> dict:
+        """Cached entry of `url`: {"url", "etag", "last_modified", "body"}. None if not cached."""
+        try:
+            with open(self._get_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def set(self, url: str, etag: str, last_modified: str, body: str):
+        path = self._get_path(url)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "body": body,
+                },
+                f,
+            )
+        os.replace(temp_path, path)  # atomic, safe with concurrent writers
+
+
+def fetch(url: str, cache_dir: str = None, timeout: float = 30) -> str:
+    """
+    Download `url` over the pooled session of the current thread.
+    @Parameters:
+    1. url: str = URL to download.
+    2. cache_dir: str = Folder of the cache. Responses are cached in its `http` subfolder and
+    revalidated with `If-None-Match`/`If-Modified-Since`. If None, responses aren't cached.
+    3. timeout: float = seconds to wait for the server.
+    @Returns: body of the response. Raises `requests.HTTPError` on error status codes.
+    """
+    cache = None
+    entry = None
+    if cache_dir:
+        cache = HTTPCache(os.path.join(cache_dir, HTTP_CACHE_FOLDER))
+        entry = cache.get(url)
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:  # not modified
+        return entry["body"]
+    response.raise_for_status()
+
+    body = response.text
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if cache and (etag or last_modified):  # can be revalidated
+        cache.set(url, etag, last_modified, body)
+    return body
+
+
+def get_raw_url(url: str) -> str:
+    """Rewrite github URLs to raw githubusercontent URLs. Other URLs are returned as is."""
+    host = urllib.request.urlparse(url).hostname or ""
     if host.startswith("github.com"):
-        # Try to open the URL.
-        is_valid = try_open_url(url)
-        if not is_valid:
-            status["url"] = url
-            return status
-        # Convert to raw githubusercontent URL.
-        url = url.replace("github.com", "raw.githubusercontent.com")
-        url = url.replace("/blob/", "/")
-        status["valid"] = try_open_url(url)
-        status["url"] = url
+        url = url.replace("github.com", "raw.githubusercontent.com", 1)
+        url = url.replace("/blob/", "/", 1)
+    return url
+
+
+def fetch_valid_url(url: str, cache_dir: str = None):
+    """
+    Make sure valid URL. Parses github URLs to raw githubusercontent URLs.
+    The URL is downloaded once: pass `status["body"]` on as the source code, e.g. to
+    `api.run(status["url"], source=status["body"])`, instead of downloading it again.
+    @Returns: {"valid", "url", "body", "error"}. `body` is None and `error` is set if the
+    URL couldn't be downloaded.
+    """
+    status = {"valid": False, "url": None, "body": None, "error": None}
+    if url is None or len(url.strip()) == 0 or not url.startswith("http"):
         return status
-    else:
-        status["valid"] = try_open_url(url)
-        status["url"] = url
+
+    url = get_raw_url(url)
+    status["url"] = url
+    try:
+        status["body"] = fetch(url, cache_dir)
+    except Exception as e:
+        status["error"] = str(e)
         return status
 
+    status["valid"] = True
+    return status
+
 
-def try_open_url(url: str):
+def try_open_url(url: str, cache_dir: str = None):
     try:
-        urllib.request.urlopen(url)
+        fetch(url, cache_dir)
         return True
     except Exception as e:
-        print(e)
+        logger.warning("Failed to open %s: %s", url, e)
         return False
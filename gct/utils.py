@@ -1,17 +1,27 @@
 import ast
-from gct.network import Node, Graph
-import random
+from gct.network import Node, Graph, get_qualified_name
+from gct.scope import ScopeIndex, get_line_identifiers
+from gct.url import fetch
+from gct.source import SourceBuffer
+import hashlib
 import gct.type_check as type_check
 import gct.constants as constants
-import graphviz
 import os
 import shutil
-import requests
 
 
-def generate_random_color():
-    """Generate random color in hex format with alpha channel set to 60"""
-    return f"#{random.randint(0, 255):02x}{random.randint(0, 255):02x}{random.randint(0, 255):02x}60"
+def generate_color(node: Node) -> str:
+    """
+    Color of a node in hex format with alpha channel set to 60. Derived from a stable hash
+    of its qualified name, so the same class gets the same color on every run (and DOT
+    output is reproducible), even if it moves within the file.
+    """
+    name = get_qualified_name(node).encode("utf-8")
+    try:  # not a security use, so it also works on FIPS builds
+        digest = hashlib.md5(name, usedforsecurity=False).digest()
+    except TypeError:  # python < 3.9
+        digest = hashlib.md5(name).digest()
+    return f"#{digest[0]:02x}{digest[1]:02x}{digest[2]:02x}60"
 
 
 def save_code_to_file(code: str, resource: str):
@@ -39,25 +49,56 @@ def flush(path: str):
                 print("Failed to delete %s. Reason: %s" % (file_path, e))
 
 
+def read_source(resource: str, cache_dir: str = None) -> str:
+    """
+    Get the source code of a resource. A resource can either be:
+    1. URL - in which case we fetch the code (see `url.fetch`). If `cache_dir` is given,
+    the response is cached and revalidated on the next fetch.
+    2. Path to a file - in which case we read the file.
+    3. Raw code - in which case it's returned as is.
+    """
+    if resource.startswith("http"):
+        return fetch(resource, cache_dir)
+    elif resource.endswith(".py"):
+        with open(resource, "r") as f:
+            return f.read()
+    return resource
+
+
+def read_source_buffer(resource: str, cache_dir: str = None) -> SourceBuffer:
+    """
+    Same as `read_source`, but files are read into a `SourceBuffer` (single read, or
+    memory-mapped if large) instead of a str. Close the buffer when done, e.g. with
+    `with read_source_buffer(path) as source:`.
+    """
+    if not resource.startswith("http") and resource.endswith(".py"):
+        return SourceBuffer.from_file(resource)
+    return SourceBuffer(read_source(resource, cache_dir))
+
+
+def parse_source(source: SourceBuffer, filename: str = "<unknown>"):
+    """Parse a source buffer into its AST. The buffer doubles as the lines of code."""
+    tree = ast.parse(source.source, filename=filename)
+    return tree, source
+
+
+def parse_code(code: str, filename: str = "<unknown>"):
+    """Parse source code into its AST and lines of code (a `SourceBuffer`)."""
+    return parse_source(SourceBuffer(code), filename)
+
+
 def parse_file(resource: str):
     """
     A resource can either be:
     1. URL - in which case we fetch the code and parse it.
     2. Path to a file - in which case we read the file and parse it.
     3. Raw code - in which case we parse it directly.
+    @Returns: AST and lines of code (a `SourceBuffer`, to close when done).
     """
-    if resource.startswith("http"):
-        response = requests.get(resource)
-        tree = ast.parse(response.text, filename=resource)
-        return tree, response.text.splitlines()
-    elif resource.endswith(".py"):
-        with open(resource, "r") as f:
-            tree = ast.parse(f.read(), filename=resource)
-            f.seek(0)
-            return tree, f.readlines()
-    else:
-        tree = ast.parse(resource)
-        return tree, resource.splitlines()
+    source = read_source_buffer(resource)
+    if resource.startswith("http") or resource.endswith(".py"):
+        return parse_source(source, filename=resource)
+    return parse_source(source)
 
 
 def get_indent_number(line: str):
@@ -91,8 +132,16 @@ def fetch_full_function(lines: "list[str]", start_lineno: int) -> "list[str]":
 
 
 def is_call_node_in_function_of_interest(
-    lines: "list[str]", call_node_name: str
+    identifiers: "set[str]", call_node_name: str
 ) -> bool:
+    """
+    Check if a function references `call_node_name`.
+    @Parameters:
+    1. identifiers: set[str] = identifiers referenced in the function, see
+    `scope.get_line_identifiers`. Strings and comments are skipped, and only whole
+    identifiers match: `run` isn't referenced by `run_all()`.
+    2. call_node_name: str = name of the called function, e.g. `self.method`.
+    """
     if not call_node_name:
         # used in node connection logic. In this case, since we only consider
         # function calls, we don't need to check if call_node_name is defined
@@ -100,13 +149,7 @@ def is_call_node_in_function_of_interest(
         # defined once in the output of `fetch_full_function`
         return True
 
-    for line in lines:
-        # check if a line is comment
-        if line.strip().startswith("#"):
-            continue
-        if call_node_name in line:
-            return True
-    return False
+    return call_node_name in identifiers
 
 
 def is_line_function_or_class(line: str):
@@ -115,7 +158,12 @@ def is_line_function_or_class(line: str):
     return False
 
 
-def get_immediate_parent(lines: "list[str]", lineno: int, call_node_name: str = None):
+def get_immediate_parent(
+    lines: "list[str]",
+    lineno: int,
+    call_node_name: str = None,
+    scope_index: ScopeIndex = None,
+):
     """
     Given a function, fx, find the most immediate parent node.
     In this case, most immediate parent node is the first instance where
@@ -148,6 +196,10 @@ def get_immediate_parent(lines: "list[str]", lineno: int, call_node_name: str =
     1. lines: list[str] = relevant lines of code.
     2. lineno:int = line number (0-based indexing) where function of interests starts from.
     3. call_node_name: str = name of function of interest.
+    4. scope_index: ScopeIndex = precomputed scope index of the file. If provided, enclosing
+    scopes are looked up directly instead of scanning `lines` upwards. `parse.extract`
+    always provides one; the line scan (and its tokenized identifiers) is only a fallback
+    for callers that don't have an AST.
     @Returns: line number of immediate parent node.
     """
     assert lineno < len(lines), "lineno out of range"
@@ -155,6 +207,18 @@ def get_immediate_parent(lines: "list[str]", lineno: int, call_node_name: str =
     if lineno < 0:
         return -1  # root node
 
+    if scope_index is not None:
+        parent_lineno = scope_index.get_enclosing_scope(lineno)
+        while parent_lineno != constants.ROOT_NODE_LINENO:
+            # check if call_node_name is defined in the enclosing function
+            if is_call_node_in_function_of_interest(
+                scope_index.get_scope_identifiers(parent_lineno), call_node_name
+            ):
+                return parent_lineno
+            parent_lineno = scope_index.get_parent_scope(parent_lineno)
+        return parent_lineno
+
+    # fallback without a scope index, not used by `parse.extract`
     start_indent = get_indent_number(lines[lineno])
 
     if start_indent == 0:  # at root level
@@ -169,8 +233,9 @@ def get_immediate_parent(lines: "list[str]", lineno: int, call_node_name: str =
         if is_line_function_or_class(line):
             # check if call_node_name is defined in the extracted function
             function_of_interest = fetch_full_function(lines, i)
+            identifiers = get_line_identifiers(function_of_interest).values()
             if is_call_node_in_function_of_interest(
-                function_of_interest, call_node_name
+                set().union(*identifiers), call_node_name
             ):
                 return i
         if ind_num == 0 and not line.strip().startswith(")"):  # root node
@@ -191,13 +256,34 @@ def find_function_of_interest(name: str, metadata: type_check.Metadata) -> "list
     """
     prefix, suffix = type_check.get_prefix_and_suffix(name)
 
+    # Targets only depend on the call name and the scope it's resolved from:
+    # direct calls are scope independent, `self` calls depend on the enclosing class.
+    resolved_scope = None
+    if prefix:
+        resolved_scope = metadata.parent_lineno
+    if prefix == constants.SELF_NODE_NAME:
+        bilevel_parent_scope = metadata.scope_index.get_parent_scope(
+            metadata.parent_lineno
+        )
+        if bilevel_parent_scope != constants.ROOT_NODE_LINENO:
+            resolved_scope = bilevel_parent_scope
+
+    cache: type_check.ResolutionCache = metadata.resolution_cache
+    if cache is not None:
+        cached_target_nodes = cache.get((name, resolved_scope))
+        if cached_target_nodes is not None:
+            return cached_target_nodes
+
     potential_target_nodes: "list[Node]" = []
 
     if prefix:
         if prefix == constants.SELF_NODE_NAME:
             # get 2nd level parent node
             bilevel_parent_lineno = get_immediate_parent(
-                metadata.raw_code, metadata.parent_lineno, name
+                metadata.raw_code,
+                metadata.parent_lineno,
+                name,
+                metadata.scope_index,
             )
             # get node name at bilevel parent node line number
             if bilevel_parent_lineno != constants.ROOT_NODE_LINENO:
@@ -209,21 +295,26 @@ def find_function_of_interest(name: str, metadata: type_check.Metadata) -> "list
         )
     else:
         potential_target_nodes = type_check.infer_direct_mappings(
-            metadata.node_line_map, suffix
+            metadata.node_graph, suffix
         )
 
+    if cache is not None:
+        cache.set((name, resolved_scope), potential_target_nodes)
+
     return potential_target_nodes
 
 
 def add_subgraphs(
     node_representation: Graph,
-    graphviz_graph: graphviz.Digraph,
+    graphviz_graph: "graphviz.Digraph",
     root: Node,
-    visited: set = set(),
+    visited: set = None,
 ):
     """Recursively traverse (depth-first) the graph, `g`, and add corresponding subgraph to `root`."""
+    if visited is None:
+        visited = set()
 
-    for node in node_representation.G.successors(root):
+    for node in node_representation.get_children_nodes(root):
         node: Node = node
         if node in visited:
             continue
@@ -236,7 +327,7 @@ def add_subgraphs(
                 text = node.__repr__()
                 if node.type == "class":
                     text = f"< <B>{text}</B> >"
-                    bgcolor = generate_random_color()
+                    bgcolor = generate_color(node)
 
                 c.attr(
                     style="rounded",
@@ -256,7 +347,7 @@ def add_subgraphs(
                 text = f"< <B>{node.__repr__()}</B> >"
                 style = "rounded, filled"
                 shape = "box"
-                bgcolor = generate_random_color()
+                bgcolor = generate_color(node)
 
             graphviz_graph.node(
                 node.id,
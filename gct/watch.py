@@ -0,0 +1,135 @@
+"""
+Watch mode. Polls the modification time of a file (or every python file of a folder)
+and re-extracts only the files that changed. Bursts of saves are debounced, and the
+graph is only re-rendered if its nodes/edges actually changed.
+"""
+import os
+import time
+
+from gct.directory import find_python_files, extract_file, merge
+from gct.network import Graph, FileExtraction
+from gct.stats import logger
+
+POLL_INTERVAL = 0.5  # seconds between two polls
+DEBOUNCE_INTERVAL = 0.3  # seconds without changes before re-extracting
+
+
+def get_structure(extraction: FileExtraction) -> tuple:
+    """
+    Everything that ends up in the rendered graph.
+    The root node spans the whole file, so it's skipped.
+    """
+    return (
+        extraction.nodes[1:],
+        extraction.containment_edges,
+        extraction.call_edges,
+    )
+
+
+class Watcher:
+    """Keeps the latest extraction of every watched file."""
+
+    def __init__(self, path: str, cache_dir: str = None):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.extractions: "dict[str, FileExtraction]" = {}
+        self._mtimes: "dict[str, int]" = {}
+
+    def _list_files(self) -> "list[str]":
+        if os.path.isdir(self.path):
+            return find_python_files(self.path)
+        return [self.path]
+
+    def poll(self) -> "set[str]":
+        """Get the files that were added, modified or removed since the last poll."""
+        mtimes: "dict[str, int]" = {}
+        for file in self._list_files():
+            try:
+                mtimes[file] = os.stat(file).st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+        changed = {
+            file
+            for file in mtimes.keys() | self._mtimes.keys()
+            if mtimes.get(file) != self._mtimes.get(file)
+        }
+        self._mtimes = mtimes
+        return changed
+
+    def update(self, changed: "set[str]") -> bool:
+        """
+        Re-extract the changed files.
+        @Parameters:
+        1. changed: set[str] = files returned by `poll`.
+        @Returns: True if the nodes/edges of any file changed.
+        """
+        is_graph_changed = False
+        for file in sorted(changed):
+            if file not in self._mtimes:  # removed
+                is_graph_changed |= self.extractions.pop(file, None) is not None
+                continue
+
+            extraction = extract_file(file, self.cache_dir)
+            if extraction.error is not None:
+                # keep the last valid extraction, e.g. while the file is being edited
+                logger.warning("Skipping %s: %s", file, extraction.error)
+                continue
+
+            previous = self.extractions.get(file)
+            self.extractions[file] = extraction
+            if previous is None or get_structure(previous) != get_structure(
+                extraction
+            ):
+                is_graph_changed = True
+        return is_graph_changed
+
+    def get_graphs(self) -> "tuple[Graph, Graph]":
+        """Get the node (containment) graph and edge (call) graph of the watched files."""
+        if os.path.isdir(self.path):
+            return merge(
+                self.path,
+                [self.extractions[file] for file in sorted(self.extractions)],
+            )
+        if self.path not in self.extractions:
+            return Graph(), Graph()
+        return self.extractions[self.path].to_graphs()
+
+
+def watch(
+    path: str,
+    on_change,
+    cache_dir: str = None,
+    poll_interval: float = POLL_INTERVAL,
+    debounce_interval: float = DEBOUNCE_INTERVAL,
+):
+    """
+    Watch `path` until interrupted, calling `on_change(watcher)` once at start and
+    every time the graph changes.
+    @Parameters:
+    1. path: str = path to a python file or a folder.
+    2. on_change: Callable[[Watcher], None] = called with the up-to-date watcher.
+    3. cache_dir: str = folder of the extraction cache. If None, caching is disabled.
+    4. poll_interval: float = seconds between two polls.
+    5. debounce_interval: float = seconds without changes before re-extracting.
+    """
+    watcher = Watcher(path, cache_dir)
+    watcher.update(watcher.poll())
+    on_change(watcher)
+
+    while True:
+        time.sleep(poll_interval)
+        changed = watcher.poll()
+        if not changed:
+            continue
+
+        # debounce bursts of saves
+        while True:
+            time.sleep(debounce_interval)
+            more_changes = watcher.poll()
+            if not more_changes:
+                break
+            changed |= more_changes
+
+        if watcher.update(changed):
+            on_change(watcher)